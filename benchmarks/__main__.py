@@ -0,0 +1,119 @@
+"""
+Run the benchmark suite headless and write the results as JSON.
+
+Run from the repository root:
+    python -m benchmarks --output results.json
+    python -m benchmarks --quick --only ecs schedule
+    python -m benchmarks --output new.json --compare old.json
+
+Every result has a "name", its "params" and "seconds" (lower is better),
+so the results of two commits can be compared with --compare.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import platform
+import subprocess
+import sys
+
+from src.auraboros import core
+
+from . import (
+    bench_ecs,
+    bench_gametext,
+    bench_particle,
+    bench_schedule,
+    bench_shader,
+    bench_ui,
+)
+
+SUITES = {
+    "ecs": (bench_ecs.run, {"entity_counts": (1_000, 10_000), "repeat": 3}),
+    "particle": (bench_particle.run, {"particle_counts": (1_000,), "repeat": 2}),
+    "schedule": (
+        bench_schedule.run,
+        {"job_counts": (100, 1000), "active_ratios": (1.0,), "frames": 120},
+    ),
+    "gametext": (bench_gametext.run, {"line_counts": (10, 100), "repeat": 3}),
+    "ui": (bench_ui.run, {"shapes": ((4, 4), (8, 4)), "repeat": 3}),
+    "shader": (
+        bench_shader.run,
+        {
+            "sizes": ((320, 240),),
+            "frames": 10,
+            "sprite_counts": (1_000,),
+            "gpu_particle_counts": (10_000,),
+        },
+    ),
+}  # name: (run function, keyword arguments for --quick)
+
+
+def _key(result: dict) -> str:
+    params = ",".join(f"{key}={value}" for key, value in result["params"].items())
+    return f"{result['name']}[{params}]"
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: list[dict], baseline: dict[str, dict] | None = None):
+    for result in results:
+        line = f"{_key(result):<72}{result['seconds'] * 1e3:>12.3f} ms"
+        if baseline and (old := baseline.get(_key(result))):
+            line += f"{result['seconds'] / old['seconds']:>8.2f}x"
+        print(line)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument(
+        "--compare", type=Path, help="JSON of an earlier run to show ratios against"
+    )
+    parser.add_argument("--only", nargs="+", choices=SUITES, help="suites to run")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    args = parser.parse_args(argv)
+
+    core.init(window_size=(960, 640), headless=True)
+    baseline = None
+    if args.compare:
+        baseline = {
+            _key(result): result
+            for result in json.loads(args.compare.read_text())["results"]
+        }
+    results = []
+    for name in args.only or SUITES:
+        run, quick_kwargs = SUITES[name]
+        suite_results = run(**quick_kwargs) if args.quick else run()
+        if not suite_results:
+            print(f"{name}: skipped", file=sys.stderr)
+        print_results(suite_results, baseline)
+        results.extend(suite_results)
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "revision": _git_revision(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "quick": args.quick,
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
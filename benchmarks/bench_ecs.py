@@ -0,0 +1,117 @@
+"""
+World create/query/delete with plain and columnar components.
+
+Run from the repository root:
+    python -m benchmarks.bench_ecs
+"""
+
+from src.auraboros.ecs.world import World, columnar_component, component
+
+from .common import measure
+
+
+@component
+class Position:
+    x: float = 0.0
+    y: float = 0.0
+
+
+@component
+class Velocity:
+    x: float = 0.0
+    y: float = 0.0
+
+
+@columnar_component
+class ColumnarPosition:
+    x: float = 0.0
+    y: float = 0.0
+
+
+@columnar_component
+class ColumnarVelocity:
+    x: float = 0.0
+    y: float = 0.0
+
+
+def _populate(world: World, count: int, position_type, velocity_type) -> list:
+    return world.create_entities(
+        count,
+        lambda i: position_type(float(i), 0.0),
+        lambda i: velocity_type(1.0, 0.5),
+    )
+
+
+def _clear(world: World):
+    world.delete_entities(list(world.get_entities(Position, ColumnarPosition)))
+
+
+def run(entity_counts=(1_000, 10_000, 100_000), repeat: int = 5) -> list[dict]:
+    results = []
+    for count in entity_counts:
+        world = World()
+        results.append(
+            measure(
+                "ecs.create_entities",
+                lambda: _populate(world, count, Position, Velocity),
+                repeat,
+                setup=lambda: _clear(world),
+                entities=count,
+            )
+        )
+        results.append(
+            measure(
+                "ecs.create_entity",
+                lambda: [
+                    world.create_entity(Position(float(i)), Velocity(1.0))
+                    for i in range(count)
+                ],
+                repeat,
+                setup=lambda: _clear(world),
+                entities=count,
+            )
+        )
+
+        query = world.query(Position, Velocity)
+
+        def iterate():
+            for _, (pos, vel) in query:
+                pos.x += vel.x
+                pos.y += vel.y
+
+        results.append(measure("ecs.query_iterate", iterate, repeat, entities=count))
+
+        columnar_world = World()
+        _populate(columnar_world, count, ColumnarPosition, ColumnarVelocity)
+        columnar_query = columnar_world.query(ColumnarPosition, ColumnarVelocity)
+
+        def iterate_chunks():
+            for pos, vel in columnar_query.chunks():
+                pos.x += vel.x
+                pos.y += vel.y
+
+        results.append(
+            measure("ecs.query_chunks_columnar", iterate_chunks, repeat, entities=count)
+        )
+
+        entities: list = []
+
+        def populate():
+            entities[:] = _populate(world, count, Position, Velocity)
+
+        results.append(
+            measure(
+                "ecs.delete_entities",
+                lambda: world.delete_entities(entities[::2]),
+                repeat,
+                setup=lambda: (_clear(world), populate()),
+                entities=count,
+            )
+        )
+    return results
+
+
+if __name__ == "__main__":
+    from .__main__ import print_results
+
+    print_results(run())
@@ -0,0 +1,49 @@
+"""
+Font2.renderln on long multiline text.
+
+Run from the repository root:
+    python -m benchmarks.bench_gametext
+"""
+
+from pathlib import Path
+
+from src.auraboros.gametext import Font2
+
+from .common import measure
+
+FONT_PATH = (
+    Path(__file__).parent.parent / "tests" / "assets" / "fonts" / "misaki_gothic.ttf"
+)
+
+
+def run(line_counts=(10, 100, 1000), repeat: int = 5) -> list[dict]:
+    font = Font2(FONT_PATH, 16)
+    results = []
+    for line_count in line_counts:
+        text = "\n".join(
+            f"{i:04} The quick brown fox jumps over the lazy dog. いろはにほへと"
+            for i in range(line_count)
+        )
+        for linelength in (None, 200):
+            results.append(
+                measure(
+                    "gametext.renderln",
+                    lambda: font.renderln(
+                        text,
+                        True,
+                        (255, 255, 255),
+                        linelength=linelength,
+                        is_window_size_default_for_length=False,
+                    ),
+                    repeat,
+                    lines=line_count,
+                    linelength=linelength,
+                )
+            )
+    return results
+
+
+if __name__ == "__main__":
+    from .__main__ import print_results
+
+    print_results(run())
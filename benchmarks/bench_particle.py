@@ -0,0 +1,85 @@
+"""
+Emitter and VectorizedEmitter update/draw with thousands of particles.
+
+Run from the repository root:
+    python -m benchmarks.bench_particle
+"""
+
+import pygame
+
+from src.auraboros.particle import Emitter, VectorizedEmitter
+from src.auraboros.schedule import Stopwatch
+
+from .common import measure
+
+FRAME_TIME = 1000 / 60
+
+
+def _fill(emitter: Emitter, count: int):
+    emitter.reset()
+    emitter.lifetime = -1
+    emitter.let_emit()
+    for _ in range(count):
+        emitter.update()
+
+
+def _fill_vectorized(emitter: VectorizedEmitter, count: int):
+    emitter.reset()
+    emitter.particle_lifetime = -1
+    emitter.emit(count)
+
+
+def run(particle_counts=(1_000, 5_000, 20_000), frames: int = 10, repeat: int = 3):
+    screen = pygame.Surface((960, 640))
+    results = []
+    for count in particle_counts:
+        emitter = Emitter(pool_capacity=count)
+        emitter.x, emitter.y = 480, 320
+        _fill(emitter, count)
+        emitter.let_freeze()
+
+        def update():
+            for _ in range(frames):
+                Stopwatch.update_all_stopwatch(FRAME_TIME)
+                emitter.update()
+                emitter.erase_finished_particles()
+
+        def draw():
+            for _ in range(frames):
+                emitter.draw(screen)
+
+        results.append(
+            measure("particle.emitter_update", update, repeat, particles=count)
+        )
+        results.append(measure("particle.emitter_draw", draw, repeat, particles=count))
+
+        vectorized = VectorizedEmitter(capacity=count, seed=0)
+        vectorized.x, vectorized.y = 480, 320
+        _fill_vectorized(vectorized, count)
+
+        def update_vectorized():
+            for _ in range(frames):
+                Stopwatch.update_all_stopwatch(FRAME_TIME)
+                vectorized.update()
+
+        def draw_vectorized():
+            for _ in range(frames):
+                vectorized.draw(screen)
+
+        results.append(
+            measure(
+                "particle.vectorized_update", update_vectorized, repeat, particles=count
+            )
+        )
+        results.append(
+            measure(
+                "particle.vectorized_draw", draw_vectorized, repeat, particles=count
+            )
+        )
+    return results
+
+
+if __name__ == "__main__":
+    from .__main__ import print_results
+
+    print_results(run())
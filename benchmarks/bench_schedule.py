@@ -0,0 +1,116 @@
+"""
+Compare the Schedule backends with many short-interval jobs which are
+rescheduled often, like animations restarted every few frames.
+
+Run from the repository root:
+    python -m benchmarks.bench_schedule
+"""
+
+from time import perf_counter
+import random
+
+from src.auraboros.schedule import (
+    HeapScheduleBackend,
+    ListScheduleBackend,
+    ScheduleBackend,
+    Stopwatch,
+    TimingWheelScheduleBackend,
+)
+
+BACKENDS: dict[str, type[ScheduleBackend]] = {
+    "list": ListScheduleBackend,
+    "heap": HeapScheduleBackend,
+    "timing_wheel": TimingWheelScheduleBackend,
+}
+
+
+def bench_backend(
+    backend: ScheduleBackend,
+    job_count: int,
+    frames: int = 600,
+    dt: float = 1000 / 60,
+    reschedule_per_frame: int = 50,
+    active_ratio: float = 1.0,
+    seed: int = 0,
+) -> dict:
+    """
+    Return seconds spent per frame in execute and rescheduling.
+    Only `active_ratio` of the jobs are activated, like sprites whose
+    animation is not playing.
+    """
+    rng = random.Random(seed)
+    calls = 0
+
+    def job():
+        nonlocal calls
+        calls += 1
+
+    jobs = []
+    for i in range(job_count):
+        # distinct functions, as with bound methods of many sprites
+        jobs.append(backend.add(lambda: job(), rng.randint(16, 200)))
+        if rng.random() < active_ratio:
+            backend.activate(jobs[-1])
+    execute_time = reschedule_time = 0.0
+    for _ in range(frames):
+        Stopwatch.update_all_stopwatch(dt)
+        started = perf_counter()
+        backend.execute()
+        execute_time += perf_counter() - started
+        started = perf_counter()
+        for job_ in rng.sample(jobs, min(reschedule_per_frame, job_count)):
+            backend.change_interval(job_, rng.randint(16, 200))
+            backend.reset(job_)
+        reschedule_time += perf_counter() - started
+    return {
+        "jobs": job_count,
+        "active_ratio": active_ratio,
+        "frames": frames,
+        "calls": calls,
+        "execute_per_frame": execute_time / frames,
+        "reschedule_per_frame": reschedule_time / frames,
+    }
+
+
+def run(
+    job_counts=(100, 1000, 10000), active_ratios=(1.0, 0.1), frames: int = 600
+) -> list[dict]:
+    results = []
+    for active_ratio in active_ratios:
+        for job_count in job_counts:
+            for name, backend_type in BACKENDS.items():
+                result = bench_backend(
+                    backend_type(), job_count, frames, active_ratio=active_ratio
+                )
+                results.append(
+                    {
+                        "name": f"schedule.{name}",
+                        "params": {
+                            "jobs": job_count,
+                            "active_ratio": active_ratio,
+                            "frames": frames,
+                        },
+                        # per frame, execute and rescheduling together
+                        "seconds": result["execute_per_frame"]
+                        + result["reschedule_per_frame"],
+                        **result,
+                    }
+                )
+    return results
+
+
+def main():
+    print(
+        f"{'backend':<24}{'jobs':>8}{'active':>8}"
+        + f"{'execute/frame':>16}{'reschedule/frame':>18}"
+    )
+    for result in run():
+        print(
+            f"{result['name']:<24}{result['jobs']:>8}{result['active_ratio']:>8}"
+            + f"{result['execute_per_frame'] * 1e6:>13.1f} us"
+            + f"{result['reschedule_per_frame'] * 1e6:>15.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
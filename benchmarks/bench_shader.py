@@ -0,0 +1,165 @@
+"""
+Shader2D upload and render of the display surface, SpriteBatch and
+GPUEmitter, on a standalone (EGL) context, so it runs without a window.
+Skipped if no context can be created.
+
+Run from the repository root:
+    python -m benchmarks.bench_shader
+"""
+
+import moderngl
+import numpy as np
+import pygame
+
+from src.auraboros.designpattern import Singleton
+from src.auraboros.gpuparticle import GPUEmitter
+from src.auraboros.schedule import GameClock
+from src.auraboros.shader import Shader2D, create_standalone_context
+from src.auraboros.spritebatch import SpriteBatch, TextureAtlas
+
+from .common import measure
+
+
+def create_shader2d(ctx: moderngl.Context) -> Shader2D:
+    """A Shader2D on `ctx`, replacing the singleton instance."""
+    Singleton._instances.pop(Shader2D, None)
+    return Shader2D(ctx=ctx)
+
+
+def _run_sprite_batch(
+    ctx: moderngl.Context, sprite_counts, repeat: int
+) -> list[dict]:
+    """SpriteBatch against Surface.blits of the same sprites."""
+    size = (960, 640)
+    sprite = pygame.Surface((8, 8), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (255, 255, 255), (4, 4), 4)
+    atlas = TextureAtlas(ctx, (64, 64))
+    region = atlas.add("sprite", sprite)
+    batch = SpriteBatch(ctx, atlas)
+    ctx.enable(moderngl.BLEND)  # the batch leaves blending to the caller
+    ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+    screen = pygame.Surface(size)
+    rng = np.random.default_rng(0)
+    results = []
+    for count in sprite_counts:
+        positions = rng.random((count, 2)) * size
+
+        def draw_batch():
+            batch.draw_many(region, positions)
+            batch.flush(size)
+            ctx.finish()
+
+        def draw_blits():
+            screen.blits(
+                [(sprite, pos) for pos in positions.astype(int).tolist()],
+                doreturn=False,
+            )
+
+        results.append(
+            measure("shader.sprite_batch", draw_batch, repeat, sprites=count)
+        )
+        results.append(
+            measure("shader.sprite_blits", draw_blits, repeat, sprites=count)
+        )
+    ctx.disable(moderngl.BLEND)
+    batch.release()
+    atlas.release()
+    return results
+
+
+def _run_gpu_emitter(
+    ctx: moderngl.Context, particle_counts, frames: int, repeat: int
+) -> list[dict]:
+    """GPUEmitter update (transform feedback) and draw of full emitters."""
+    size = (960, 640)
+    rng = np.random.default_rng(0)
+    ctx.enable(moderngl.BLEND)
+    ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+    results = []
+    for count in particle_counts:
+        emitter = GPUEmitter(ctx, capacity=count, seed=0)
+        emitter.particle_lifetime = -1
+        for _ in range(0, count, 100):  # spread over the screen like sprites
+            emitter.x, emitter.y = rng.random(2) * size
+            emitter.emit(100)
+
+        def update():
+            for _ in range(frames):
+                GameClock.time += 1000 / 60
+                emitter.update()
+            ctx.finish()
+
+        def draw():
+            for _ in range(frames):
+                emitter.draw(size)
+            ctx.finish()
+
+        params = {"particles": count, "frames": frames}
+        results.append(measure("shader.gpu_emitter_update", update, repeat, **params))
+        results.append(measure("shader.gpu_emitter_draw", draw, repeat, **params))
+        emitter.release()
+    ctx.disable(moderngl.BLEND)
+    return results
+
+
+def run(
+    sizes=((320, 240), (960, 640), (1920, 1080)),
+    frames: int = 30,
+    sprite_counts=(1_000, 10_000, 100_000),
+    gpu_particle_counts=(10_000, 100_000, 500_000),
+    repeat: int = 3,
+) -> list[dict]:
+    try:
+        ctx = create_standalone_context()
+    except Exception:
+        return []
+    shader2d = create_shader2d(ctx)
+    framebuffer = ctx.simple_framebuffer((1920, 1080))
+    framebuffer.use()
+    results = []
+    try:
+        for size in sizes:
+            surface = pygame.Surface(size)
+            name = f"bench_{size[0]}x{size[1]}"
+
+            def upload():
+                for i in range(frames):
+                    surface.fill((i, 0, 0))
+                    shader2d.register_surface_as_texture(surface, name)
+                ctx.finish()
+
+            def upload_and_render():
+                for i in range(frames):
+                    surface.fill((i, 0, 0))
+                    shader2d.register_surface_as_texture(surface, name)
+                    shader2d.use_texture(name, 0)
+                    shader2d.render()
+                ctx.finish()
+
+            def upload_dirty_rect():
+                for i in range(frames):
+                    rect = pygame.Rect(i % (size[0] - 32), 0, 32, 32)
+                    surface.fill((i, 0, 0), rect)
+                    shader2d.register_surface_as_texture(surface, name, [rect])
+                ctx.finish()
+
+            params = {"width": size[0], "height": size[1], "frames": frames}
+            results.append(measure("shader.upload", upload, repeat, **params))
+            results.append(
+                measure("shader.upload_dirty_rect", upload_dirty_rect, repeat, **params)
+            )
+            results.append(
+                measure("shader.upload_render", upload_and_render, repeat, **params)
+            )
+        results.extend(_run_sprite_batch(ctx, sprite_counts, repeat))
+        results.extend(_run_gpu_emitter(ctx, gpu_particle_counts, frames, repeat))
+    finally:
+        Singleton._instances.pop(Shader2D, None)
+        ctx.release()
+    return results
+
+
+if __name__ == "__main__":
+    from .__main__ import print_results
+
+    print_results(run())
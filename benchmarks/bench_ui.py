@@ -0,0 +1,52 @@
+"""
+UIFlowLayout size calculation and relocation of deep and wide trees.
+
+Run from the repository root:
+    python -m benchmarks.bench_ui
+"""
+
+from src.auraboros.ui import UI, Orientation, UIFlowLayout
+
+from .common import measure
+
+
+def build_tree(depth: int, breadth: int) -> UIFlowLayout:
+    """A tree of layouts alternating orientation, with `breadth` leaves each."""
+    orientation = Orientation.VERTICAL if depth % 2 else Orientation.HORIZONTAL
+    layout = UIFlowLayout([0, 0], spacing=2, orientation=orientation)
+    for i in range(breadth):
+        layout.add_child(UI([0, 0], [8 + i, 8]))
+    if depth > 1:
+        layout.add_child(build_tree(depth - 1, breadth))
+    return layout
+
+
+def run(shapes=((4, 4), (6, 4), (8, 4), (3, 64)), repeat: int = 3) -> list[dict]:
+    results = []
+    for depth, breadth in shapes:
+        layout = build_tree(depth, breadth)
+        results.append(
+            measure(
+                "ui.flowlayout_size",
+                lambda: layout.size.real,
+                repeat,
+                depth=depth,
+                breadth=breadth,
+            )
+        )
+        results.append(
+            measure(
+                "ui.flowlayout_relocate",
+                layout.relocate_children,
+                repeat,
+                depth=depth,
+                breadth=breadth,
+            )
+        )
+    return results
+
+
+if __name__ == "__main__":
+    from .__main__ import print_results
+
+    print_results(run())
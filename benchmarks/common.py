@@ -0,0 +1,32 @@
+"""Helpers shared by the benchmark modules."""
+
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    repeat: int = 5,
+    setup: Callable[[], Any] | None = None,
+    **params,
+) -> dict:
+    """
+    Call `func` `repeat` times, after `setup` each time if given, and
+    return a result whose "seconds" is the best (lowest) time.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = perf_counter()
+        func()
+        times.append(perf_counter() - started)
+    return {
+        "name": name,
+        "params": params,
+        "seconds": min(times),
+        "median": median(times),
+        "repeat": repeat,
+    }
@@ -4,6 +4,11 @@ import pygame
 
 os.environ["SDL_IME_SHOW_UI"] = "1"
 
+_NOT_HEADLESS = object()
+# SDL_VIDEODRIVER before init(headless=True) replaced it, restored by
+# a later init(headless=False)
+_video_driver_before_headless = _NOT_HEADLESS
+
 
 class Global:
     """
@@ -19,7 +24,9 @@ class Global:
     screen: pygame.surface.Surface = None
     base_px_scale: float = None
     is_initialized: bool = False
+    is_headless: bool = False
     use_opengl_display: bool = False
+    is_display_scaled_by_sdl: bool = False
     screen_size_in_unscaled_px: tuple[int, int] = None
     shrinked_screen_size_for_scale_px: tuple[int, int] = None
     is_scale_px_of_display_from_pygame_get_surface_called: bool = False
@@ -37,17 +44,49 @@ def init(
     base_pixel_scale: float = 1.0,
     display_set_mode_flags=0,
     stop_handling_textinput_events_at_init=True,
+    headless=False,
+    scale_display_by_sdl=False,
 ):
     """
     This function initialize pygame and the game engine.
 
     Args:
+        headless (bool):
+            Run without a window, using SDL's dummy video driver.
+            The display surface still exists but is never shown, and
+            pygame.OPENGL in display_set_mode_flags is ignored.
+            `engine.run` does not cap the frame rate in this mode.
+            A later init without headless restores SDL_VIDEODRIVER.
+        scale_display_by_sdl (bool):
+            Create the display in scaled px with pygame.SCALED, so SDL
+            scales it to the window (on the GPU where available) and
+            Global.screen is the display surface itself. SDL picks
+            the window size, and mouse positions are in scaled px.
+            Ignored with pygame.OPENGL, which scales on the GPU anyway,
+            and if SDL cannot create a renderer.
         start_handling_textinput_events_at_init (bool):
             pygame.key.stop_text_input() if True,
             pygame.key.start_text_input() if False.
         display_set_mode_flags (int):
             pygame.display.set_mode(flags=display_set_mode_flags)
     """
+    global _video_driver_before_headless
+    if headless:
+        if pygame.display.get_init() and pygame.display.get_driver() != "dummy":
+            pygame.display.quit()
+        video_driver = os.environ.get("SDL_VIDEODRIVER")
+        if _video_driver_before_headless is _NOT_HEADLESS or video_driver != "dummy":
+            _video_driver_before_headless = video_driver
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        display_set_mode_flags &= ~pygame.OPENGL
+    elif _video_driver_before_headless is not _NOT_HEADLESS:
+        pygame.display.quit()
+        if _video_driver_before_headless is None:
+            del os.environ["SDL_VIDEODRIVER"]
+        else:
+            os.environ["SDL_VIDEODRIVER"] = _video_driver_before_headless
+        _video_driver_before_headless = _NOT_HEADLESS
+    Global.is_headless = headless
     pygame.init()
 
     # --configure fps--
@@ -72,7 +111,23 @@ def init(
     Global.shrinked_screen_size_for_scale_px = tuple(
         [length // Global.base_px_scale for length in Global.screen_size_in_unscaled_px]
     )
-    pygame.display.set_mode(Global.screen_size_in_unscaled_px, display_set_mode_flags)
+    Global.is_display_scaled_by_sdl = (
+        scale_display_by_sdl and not Global.use_opengl_display
+    )
+    Global.is_scale_px_of_display_from_pygame_get_surface_called = False
+    if Global.is_display_scaled_by_sdl:
+        try:
+            pygame.display.set_mode(
+                Global.shrinked_screen_size_for_scale_px,
+                display_set_mode_flags | pygame.SCALED,
+            )
+        except pygame.error:
+            # no renderer (e.g. the dummy video driver); scale on the CPU
+            Global.is_display_scaled_by_sdl = False
+    if not Global.is_display_scaled_by_sdl:
+        pygame.display.set_mode(
+            Global.screen_size_in_unscaled_px, display_set_mode_flags
+        )
     pygame.display.set_caption(caption)
     if icon_filepath:
         icon_surface = pygame.image.load(icon_filepath)
@@ -82,11 +137,29 @@ def init(
 
 
 def scale_px_of_pygame_get_surface_display():
+    """
+    Present Global.screen, which is in scaled px, on the display by
+    the cheapest path:
+        OpenGL: nothing on the CPU; Shader2D uploads Global.screen and
+            the sampler scales it.
+        pygame.SCALED (`scale_display_by_sdl`): nothing; Global.screen is
+            the display surface and SDL scales it.
+        pixel scale 1: a plain blit.
+        otherwise: a nearest-neighbour scale into the display surface.
+    The first call replaces Global.screen with the surface in scaled px.
+    """
     if not Global.is_scale_px_of_display_from_pygame_get_surface_called:
-        Global.screen = pygame.Surface(Global.shrinked_screen_size_for_scale_px)
+        if Global.is_display_scaled_by_sdl:
+            Global.screen = pygame.display.get_surface()
+        else:
+            Global.screen = pygame.Surface(Global.shrinked_screen_size_for_scale_px)
         Global.is_scale_px_of_display_from_pygame_get_surface_called = True
-    pygame.transform.scale(
-        Global.screen,
-        Global.screen_size_in_unscaled_px,
-        pygame.display.get_surface(),
-    )
+    if Global.use_opengl_display:
+        return
+    display = pygame.display.get_surface()
+    if Global.screen is display:
+        return
+    if Global.screen.get_size() == display.get_size():
+        display.blit(Global.screen, (0, 0))
+    else:
+        pygame.transform.scale(Global.screen, display.get_size(), display)
@@ -0,0 +1,162 @@
+from typing import TYPE_CHECKING, Any, Iterable
+
+from .columnar import ColumnarColumn, ColumnView, is_columnar
+
+if TYPE_CHECKING:
+    from .world import World
+
+# -type aliases-
+EntityID = int
+TypeOfComponent = type
+Signature = frozenset[TypeOfComponent]
+
+# An EntityID packs the index of its slot with the generation of the slot,
+# which is bumped every time the slot is freed, so ids of deleted entities
+# never match a recycled one.
+ENTITY_INDEX_BITS = 32
+_ENTITY_INDEX_MASK = (1 << ENTITY_INDEX_BITS) - 1
+
+
+def make_entity_id(index: int, generation: int) -> EntityID:
+    return (generation << ENTITY_INDEX_BITS) | index
+
+
+def entity_index(entity: EntityID) -> int:
+    return entity & _ENTITY_INDEX_MASK
+
+
+def entity_generation(entity: EntityID) -> int:
+    return entity >> ENTITY_INDEX_BITS
+
+
+class Archetype:
+    """
+    Table of entities sharing exactly the same set of component types.
+
+    Each component type of the signature owns one column (a list), and the
+    n-th row of every column belongs to `entities[n]`. Rows are kept dense
+    by swap-removal, so iterating a column never touches a hole.
+    Columnar components (see `columnar_component`) are stored as NumPy
+    arrays instead of lists.
+
+    Attributes:
+        signature: frozenset of component types stored in this table.
+        world: the World owning this table.
+        entities: entity ids in row order.
+        columns: component type -> list of component values in row order,
+            or `ColumnarColumn` for columnar components.
+    """
+
+    def __init__(self, signature: Iterable[TypeOfComponent], world: "World"):
+        self.signature: Signature = frozenset(signature)
+        self.world = world
+        self.entities: list[EntityID] = []
+        self.columns: dict[TypeOfComponent, list[Any] | ColumnarColumn] = {
+            component_: ColumnarColumn(component_, self)
+            if is_columnar(component_)
+            else []
+            for component_ in self.signature
+        }
+        self._rows: dict[EntityID, int] = {}
+        # archetypes reached by adding/removing one component type
+        self._edges_add: dict[TypeOfComponent, "Archetype"] = {}
+        self._edges_remove: dict[TypeOfComponent, "Archetype"] = {}
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __contains__(self, entity: EntityID) -> bool:
+        return entity in self._rows
+
+    def __repr__(self) -> str:
+        names = sorted(component_.__name__ for component_ in self.signature)
+        return f"Archetype({', '.join(names)}; {len(self)} entities)"
+
+    def row_of(self, entity: EntityID) -> int:
+        return self._rows[entity]
+
+    def column(self, component_: TypeOfComponent) -> list[Any] | ColumnView:
+        """
+        Return the dense column of the given component type.
+        For columnar components this is a `ColumnView` of NumPy arrays.
+        """
+        column = self.columns[component_]
+        if isinstance(column, ColumnarColumn):
+            return column.view()
+        return column
+
+    def get(self, entity: EntityID, component_: TypeOfComponent) -> Any:
+        column = self.columns[component_]
+        if isinstance(column, ColumnarColumn):
+            if entity not in self._rows:
+                raise KeyError(entity)
+            return column.proxy(entity)
+        return column[self._rows[entity]]
+
+    def append(self, entity: EntityID, components: dict[TypeOfComponent, Any]):
+        """Append a row. `components` must cover the whole signature."""
+        self._rows[entity] = len(self.entities)
+        self.entities.append(entity)
+        for component_, column in self.columns.items():
+            column.append(components[component_])
+
+    def extend(
+        self, entities: list[EntityID], columns: dict[TypeOfComponent, list[Any]]
+    ):
+        """Append many rows at once. `columns` must cover the whole signature."""
+        start = len(self.entities)
+        self._rows.update(zip(entities, range(start, start + len(entities))))
+        self.entities.extend(entities)
+        for component_, column in self.columns.items():
+            column.extend(columns[component_])
+
+    def pop(self, entity: EntityID) -> dict[TypeOfComponent, Any]:
+        """
+        Remove the row of the entity by moving the last row into its place
+        and return the removed components.
+        """
+        row = self._rows.pop(entity)
+        last_entity = self.entities.pop()
+        removed = {}
+        for component_, column in self.columns.items():
+            last_value = column.pop()
+            if last_entity != entity:
+                removed[component_] = column[row]
+                column[row] = last_value
+            else:
+                removed[component_] = last_value
+        if last_entity != entity:
+            self.entities[row] = last_entity
+            self._rows[last_entity] = row
+        return removed
+
+    def remove_many(self, entities: Iterable[EntityID]):
+        """
+        Remove the rows of many entities. A few rows are swap-removed, but
+        when a large part of the table goes the remaining rows are compacted
+        in one pass instead.
+        """
+        removing = set(entities)
+        if len(removing) == len(self.entities):
+            self.clear()
+            return
+        if len(removing) * 8 < len(self.entities):
+            for entity in removing:
+                self.pop(entity)
+            return
+        keep = [
+            row for row, entity in enumerate(self.entities) if entity not in removing
+        ]
+        self.entities = [self.entities[row] for row in keep]
+        self._rows = {entity: row for row, entity in enumerate(self.entities)}
+        for column in self.columns.values():
+            if isinstance(column, ColumnarColumn):
+                column.compact(keep)
+            else:
+                column[:] = [column[row] for row in keep]
+
+    def clear(self):
+        self.entities.clear()
+        self._rows.clear()
+        for column in self.columns.values():
+            column.clear()
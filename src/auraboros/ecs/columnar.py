@@ -0,0 +1,256 @@
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any, Iterator, get_type_hints
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .archetype import Archetype, EntityID
+    from .world import World
+
+_DTYPE_OF_BUILTIN = {int: np.int64, float: np.float64, bool: np.bool_}
+_INITIAL_CAPACITY = 16
+
+
+class Vector:
+    """
+    Field type of a columnar component which holds a fixed-length vector.
+
+    Examples:
+        @columnar_component
+        class Position:
+            pos: Vector(float, 3)
+    """
+
+    def __init__(self, dtype, length: int):
+        self.dtype = np.dtype(_DTYPE_OF_BUILTIN.get(dtype, dtype))
+        self.length = length
+
+    def __repr__(self) -> str:
+        return f"Vector({self.dtype}, {self.length})"
+
+
+def _field_layout(annotation) -> tuple[np.dtype, tuple[int, ...]]:
+    if isinstance(annotation, Vector):
+        return annotation.dtype, (annotation.length,)
+    try:
+        return np.dtype(_DTYPE_OF_BUILTIN.get(annotation, annotation)), ()
+    except TypeError:
+        raise TypeError(
+            f"{annotation!r} is not a numeric type; "
+            + "columnar component fields must be int, float, bool, "
+            + "a numpy scalar type or Vector."
+        ) from None
+
+
+def columnar_component(cls=None, **dataclass_kwargs):
+    """
+    Like `component`, but the World stores the fields of this component in
+    contiguous NumPy arrays (one array per field) instead of keeping
+    the instances.
+
+    `World.component_for_entity` returns a lightweight proxy which reads and
+    writes the arrays, and `Archetype.column` returns a `ColumnView` whose
+    attributes are the arrays themselves, so systems can update every
+    entity of an archetype in one vectorised operation.
+
+    Examples:
+        @columnar_component
+        class Velocity:
+            x: float = 0.0
+            y: float = 0.0
+
+        for pos, vel in world.query(Position, Velocity).chunks():
+            pos.x += vel.x * dt
+    """
+
+    def wrap(cls):
+        cls = dataclass(cls, **dataclass_kwargs)
+        hints = get_type_hints(cls)
+        cls.__columnar_fields__ = {
+            field_.name: _field_layout(hints[field_.name]) for field_ in fields(cls)
+        }
+        cls.__columnar_proxy__ = _make_proxy_class(cls)
+        return cls
+
+    if cls is None:
+        return wrap
+    return wrap(cls)
+
+
+def is_columnar(component_: type) -> bool:
+    return "__columnar_fields__" in component_.__dict__
+
+
+class ColumnView:
+    """
+    Vectorised view of a columnar component inside one archetype.
+    Every field is exposed as a NumPy array of the archetype's length.
+    The arrays are views: writing to them writes to the World, but they
+    are invalidated by the next structural change of the archetype.
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        self.__dict__.update(arrays)
+
+    def __repr__(self) -> str:
+        return f"ColumnView({self.__dict__})"
+
+
+class ColumnarProxy:
+    """
+    Base class of the proxies returned for columnar components.
+    The proxy looks the entity up in the world on every access, so it keeps
+    working after the entity moves to another archetype. Proxies compare
+    equal to components of their class with the same field values.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, world: "World", component_: type, entity: "EntityID"):
+        object.__setattr__(self, "_world", world)
+        object.__setattr__(self, "_component", component_)
+        object.__setattr__(self, "_entity", entity)
+
+    def _locate(self) -> tuple["ColumnarColumn", int]:
+        archetype = self._world._entity_archetype[self._entity]
+        return archetype.columns[self._component], archetype.row_of(self._entity)
+
+    def detach(self) -> Any:
+        """Return a plain component holding a copy of the current values."""
+        column, row = self._locate()
+        return column[row]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, self._component):
+            return NotImplemented
+        return all(
+            np.array_equal(getattr(self, name), getattr(other, name))
+            for name in self._component.__columnar_fields__
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in self._component.__columnar_fields__
+        )
+        return f"{self._component.__qualname__}({values})"
+
+
+def detach(component_: Any) -> Any:
+    """Replace a columnar proxy by a plain copy; other components pass as is."""
+    if isinstance(component_, ColumnarProxy):
+        return component_.detach()
+    return component_
+
+
+def _field_property(name: str) -> property:
+    def getter(self):
+        column, row = self._locate()
+        array = column.arrays[name]
+        return array[row] if array.ndim > 1 else array[row].item()
+
+    def setter(self, value):
+        column, row = self._locate()
+        column.arrays[name][row] = value
+
+    return property(getter, setter)
+
+
+def _make_proxy_class(cls) -> type:
+    namespace = {
+        "__slots__": ("_world", "_component", "_entity"),
+        "__init__": ColumnarProxy.__init__,
+    }
+    for name in cls.__columnar_fields__:
+        namespace[name] = _field_property(name)
+    return type(f"{cls.__name__}Proxy", (ColumnarProxy, cls), namespace)
+
+
+class ColumnarColumn:
+    """
+    Struct-of-arrays storage of one columnar component type in an archetype.
+    It supports the list operations the archetype needs, where items are
+    materialised component instances.
+    """
+
+    def __init__(self, component_: type, archetype: "Archetype"):
+        self.component = component_
+        self.archetype = archetype
+        self._proxy_class = component_.__columnar_proxy__
+        self._length = 0
+        self.arrays: dict[str, np.ndarray] = {
+            name: np.zeros((_INITIAL_CAPACITY,) + shape, dtype=dtype)
+            for name, (dtype, shape) in component_.__columnar_fields__.items()
+        }
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self.arrays.values()), ()))
+
+    def reserve(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+        for name, array in self.arrays.items():
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[: self._length] = array[: self._length]
+            self.arrays[name] = grown
+
+    def append(self, component_):
+        if self._length == self.capacity:
+            self.reserve(max(_INITIAL_CAPACITY, self.capacity * 2))
+        self[self._length] = component_
+        self._length += 1
+
+    def extend(self, components: list):
+        needed = self._length + len(components)
+        if needed > self.capacity:
+            capacity = max(_INITIAL_CAPACITY, self.capacity)
+            while capacity < needed:
+                capacity *= 2
+            self.reserve(capacity)
+        for name, array in self.arrays.items():
+            array[self._length : needed] = [
+                getattr(component_, name) for component_ in components
+            ]
+        self._length = needed
+
+    def pop(self) -> Any:
+        self._length -= 1
+        return self[self._length]
+
+    def clear(self):
+        self._length = 0
+
+    def compact(self, rows: list[int]):
+        """Keep only the given rows, in the given order."""
+        for array in self.arrays.values():
+            array[: len(rows)] = array[rows]
+        self._length = len(rows)
+
+    def __getitem__(self, row: int) -> Any:
+        instance = object.__new__(self.component)
+        for name, array in self.arrays.items():
+            value = array[row]
+            value = value.copy() if array.ndim > 1 else value.item()
+            object.__setattr__(instance, name, value)
+        return instance
+
+    def __setitem__(self, row: int, component_):
+        for name, array in self.arrays.items():
+            array[row] = getattr(component_, name)
+
+    def __iter__(self) -> Iterator[ColumnarProxy]:
+        return (self.proxy(entity) for entity in self.archetype.entities)
+
+    def proxy(self, entity: "EntityID") -> ColumnarProxy:
+        return self._proxy_class(self.archetype.world, self.component, entity)
+
+    def view(self) -> ColumnView:
+        return ColumnView(
+            {name: array[: self._length] for name, array in self.arrays.items()}
+        )
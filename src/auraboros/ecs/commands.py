@@ -0,0 +1,93 @@
+from typing import TYPE_CHECKING, Any
+
+from .archetype import EntityID, TypeOfComponent
+
+if TYPE_CHECKING:
+    from .world import World
+
+_SPAWN = 0
+_DESPAWN = 1
+_ADD_COMPONENT = 2
+_REMOVE_COMPONENT = 3
+
+
+class CommandBuffer:
+    """
+    Records structural changes of a World to apply them later at once.
+
+    Systems should use `world.commands` instead of creating or deleting
+    entities directly, because that would change the archetypes which
+    are being iterated. `World.do_systems` applies the buffer after all
+    systems have run; call `apply()` to do it at any other sync point.
+    Systems of one stage running on the scheduler's thread pool may record
+    commands concurrently; ids are reserved under the world's lock.
+
+    Examples:
+        class Cleanup(System):
+            def do(self):
+                for entity, (life,) in self.world.query(Life):
+                    if life.value <= 0:
+                        self.world.commands.despawn(entity)
+    """
+
+    def __init__(self, world: "World"):
+        self.world = world
+        self._commands: list[tuple[int, Any, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def spawn(self, *components) -> EntityID:
+        """
+        Record an entity creation. The id is reserved right away, so it can
+        be referenced by later commands.
+        """
+        entity = self.world._reserve_entity_id()
+        self._commands.append((_SPAWN, entity, components))
+        return entity
+
+    def despawn(self, entity: EntityID):
+        """Record an entity deletion. Despawning an entity twice is harmless."""
+        self._commands.append((_DESPAWN, entity, None))
+
+    def add_component(self, entity: EntityID, component_):
+        self._commands.append((_ADD_COMPONENT, entity, component_))
+
+    def remove_component(self, entity: EntityID, component_: TypeOfComponent):
+        self._commands.append((_REMOVE_COMPONENT, entity, component_))
+
+    def clear(self):
+        """Discard the recorded commands and release the ids of their spawns."""
+        for op, entity, _ in self._commands:
+            if op == _SPAWN:
+                self.world._release_entity_id(entity)
+        self._commands.clear()
+
+    def apply(self):
+        """
+        Apply the recorded commands in order. Consecutive despawns are
+        deleted together with `World.delete_entities`. Like despawns,
+        component changes of entities which no longer exist, and removals of
+        components the entity no longer has, are skipped, so systems may
+        despawn and tag the same entity in one frame.
+        """
+        world = self.world
+        commands, self._commands = self._commands, []
+        despawns: list[EntityID] = []
+        for op, entity, arg in commands:
+            if op == _DESPAWN:
+                despawns.append(entity)
+                continue
+            if despawns:
+                world.delete_entities(despawns)
+                despawns = []
+            if op == _SPAWN:
+                world._spawn(entity, arg)
+            elif (archetype := world._entity_archetype.get(entity)) is None:
+                continue
+            elif op == _ADD_COMPONENT:
+                world.add_component_to(entity, arg)
+            elif op == _REMOVE_COMPONENT and arg in archetype.signature:
+                world.remove_component_of(entity, arg)
+        if despawns:
+            world.delete_entities(despawns)
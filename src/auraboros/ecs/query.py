@@ -0,0 +1,109 @@
+from itertools import repeat
+from typing import Any, Iterable, Iterator
+
+from .archetype import Archetype, EntityID, Signature, TypeOfComponent
+from .stats import WorldStats
+
+
+class Query:
+    """
+    Cached view of the archetypes matching a component filter.
+
+    A query is created and registered by `World.query`. The world hands
+    every newly created archetype to its registered queries, so the list of
+    matching archetypes is never rebuilt and iterating costs only as much
+    as the number of matched entities.
+
+    Attributes:
+        all_of: component types an entity must all have.
+        any_of: component types of which an entity must have at least one.
+        archetypes: matching archetypes (may include empty ones).
+
+    Examples:
+        query = world.query(Position, Velocity)
+        for entity, (pos, vel) in query:
+            pos.x += vel.x
+    """
+
+    def __init__(
+        self,
+        all_of: Iterable[TypeOfComponent] = (),
+        any_of: Iterable[TypeOfComponent] = (),
+        stats: WorldStats | None = None,
+    ):
+        self.all_of: tuple[TypeOfComponent, ...] = tuple(all_of)
+        self.any_of: tuple[TypeOfComponent, ...] = tuple(any_of)
+        self._all_of_set = frozenset(self.all_of)
+        self._any_of_set = frozenset(self.any_of)
+        self.archetypes: list[Archetype] = []
+        self._stats = stats if stats is not None else WorldStats()
+
+    def matches(self, signature: Signature) -> bool:
+        if not self._all_of_set.issubset(signature):
+            return False
+        return not self._any_of_set or not self._any_of_set.isdisjoint(signature)
+
+    def _register_archetype(self, archetype: Archetype):
+        if self.matches(archetype.signature):
+            self.archetypes.append(archetype)
+
+    def __len__(self) -> int:
+        return sum(len(archetype) for archetype in self.archetypes)
+
+    def __iter__(self) -> Iterator[tuple[EntityID, tuple[Any, ...]]]:
+        """
+        Yield `(entity, components)` where components are ordered as
+        `all_of + any_of`. Components of `any_of` the entity lacks are None.
+
+        The matching rows are captured when the iteration starts, so the loop
+        may delete entities or add/remove their components; entities deleted
+        before they are reached are skipped.
+        """
+        components = self.all_of + self.any_of
+        snapshots = []
+        for archetype in self.archetypes:
+            if not archetype.entities:
+                continue
+            self._stats.count_query_hits(len(archetype))
+            columns = [
+                list(archetype.columns[component_])
+                if component_ in archetype.columns
+                else repeat(None)
+                for component_ in components
+            ]
+            snapshots.append(zip(archetype.entities.copy(), *columns))
+        if not snapshots:
+            return
+        alive = self.archetypes[0].world._entity_archetype
+        for rows in snapshots:
+            for row in rows:
+                if row[0] in alive:
+                    yield row[0], row[1:]
+    def chunks(self) -> Iterator[tuple[Any, ...]]:
+        """
+        Yield, per non-empty matching archetype, the columns of `all_of`
+        (see `Archetype.column`). With columnar components this allows
+        vectorised systems:
+
+            for pos, vel in world.query(Position, Velocity).chunks():
+                pos.x += vel.x * dt
+        """
+        for archetype in self.archetypes:
+            if archetype.entities:
+                self._stats.count_query_hits(len(archetype))
+                yield tuple(archetype.column(component_) for component_ in self.all_of)
+
+    def entities(self) -> Iterator[EntityID]:
+        """Yield the matching entities, captured like `__iter__`."""
+        snapshots = []
+        for archetype in self.archetypes:
+            if archetype.entities:
+                self._stats.count_query_hits(len(archetype))
+                snapshots.append(archetype.entities.copy())
+        if not snapshots:
+            return
+        alive = self.archetypes[0].world._entity_archetype
+        for entities in snapshots:
+            for entity in entities:
+                if entity in alive:
+                    yield entity
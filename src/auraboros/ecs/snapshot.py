@@ -0,0 +1,211 @@
+"""
+Snapshot and restore of a World in a compact binary format.
+
+Layout:
+    MAGIC (4 bytes) | version (uint32) | header size (uint64) | header (pickle)
+    | padding to 64 bytes | data section
+
+The header only describes the world: archetype signatures, system order
+and where each buffer is in the data section. Systems themselves are not
+saved, since they may hold surfaces, fonts or callbacks; only the order of
+their types is, and restoring reorders the systems of the target world.
+
+Columnar components and entity ids are written as raw array buffers, so
+numeric data is never pickled element by element; only the columns of
+ordinary components are pickled as lists. Restoring reads through a
+memoryview, and `load_world` maps the file instead of reading it, so a large
+save is copied only once, into the world.
+"""
+
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable
+import io
+import mmap
+import pickle
+import struct
+
+import numpy as np
+
+from .columnar import ColumnarColumn
+
+if TYPE_CHECKING:
+    from .world import World
+
+MAGIC = b"ABWS"
+VERSION = 2
+_PREFIX = struct.Struct("<4sIQ")
+_ALIGNMENT = 64
+
+BufferRef = tuple[int, int, str, tuple[int, ...]]  # offset, size, dtype, shape
+
+
+def _padding(position: int) -> int:
+    return -position % _ALIGNMENT
+
+
+def _system_name(system) -> str:
+    system_type = type(system)
+    return f"{system_type.__module__}.{system_type.__qualname__}"
+
+
+def _reorder_systems(world: "World", names: list[str]):
+    """
+    Order the systems of the world as `names`, keeping the instances.
+    Systems not in `names` follow in their current order; names without a
+    system in the world are ignored.
+    """
+    remaining = list(world._systems)
+    ordered = []
+    for name in names:
+        for system in remaining:
+            if _system_name(system) == name:
+                ordered.append(system)
+                remaining.remove(system)
+                break
+    world._systems = ordered + remaining
+    world.scheduler.invalidate()
+
+
+class _DataSection:
+    def __init__(self):
+        self.buffers: list[Any] = []
+        self.size = 0
+
+    def add(self, buffer: Any, dtype: str = "u1", shape=None) -> BufferRef:
+        view = memoryview(buffer).cast("B")
+        offset = self.size
+        self.buffers.append(view)
+        self.size += view.nbytes
+        padding = _padding(self.size)
+        if padding:
+            self.buffers.append(bytes(padding))
+            self.size += padding
+        return (offset, view.nbytes, dtype, shape or (view.nbytes,))
+
+    def add_array(self, array: np.ndarray) -> BufferRef:
+        array = np.ascontiguousarray(array)
+        return self.add(array, array.dtype.str, array.shape)
+
+
+def _dump(world: "World", write: Callable[[Any], Any]):
+    data = _DataSection()
+    archetypes = []
+    for archetype in world._archetypes.values():
+        if not archetype.entities:
+            continue
+        columnar, pickled = {}, {}
+        for component_, column in archetype.columns.items():
+            if isinstance(column, ColumnarColumn):
+                columnar[component_] = {
+                    name: data.add_array(array[: len(column)])
+                    for name, array in column.arrays.items()
+                }
+            else:
+                pickled[component_] = data.add(
+                    pickle.dumps(column, pickle.HIGHEST_PROTOCOL)
+                )
+        archetypes.append(
+            {
+                "signature": tuple(archetype.signature),
+                "entities": data.add_array(np.array(archetype.entities, np.int64)),
+                "columnar": columnar,
+                "pickled": pickled,
+            }
+        )
+    header = pickle.dumps(
+        {
+            "next_entity_id": world.next_entity_id,
+            "generations": data.add_array(np.array(world._generations, np.int64)),
+            "free_indices": data.add_array(np.array(world._free_indices, np.int64)),
+            "archetypes": archetypes,
+            "systems": [_system_name(system) for system in world._systems],
+        },
+        pickle.HIGHEST_PROTOCOL,
+    )
+    prefix = _PREFIX.pack(MAGIC, VERSION, len(header))
+    write(prefix)
+    write(header)
+    write(bytes(_padding(len(prefix) + len(header))))
+    for buffer in data.buffers:
+        write(buffer)
+
+
+def snapshot(world: "World") -> bytes:
+    """Serialise the world (entities, components and system order)."""
+    stream = io.BytesIO()
+    _dump(world, stream.write)
+    return stream.getvalue()
+
+
+def save_world(world: "World", file: str | Path | IO[bytes]):
+    """Write a snapshot to a path or a binary file object, buffer by buffer."""
+    if isinstance(file, (str, Path)):
+        with open(file, "wb") as f:
+            _dump(world, f.write)
+    else:
+        _dump(world, file.write)
+
+
+def restore(world: "World", data) -> "World":
+    """
+    Replace the entities and components of `world` with the ones of a
+    snapshot and reorder its systems as they were saved. The system
+    instances of `world` are kept, so add the systems before restoring into
+    a new World. `data` may be anything supporting the buffer protocol
+    (bytes, memoryview, mmap). Queries of the world stay registered.
+    Pending commands are discarded.
+    """
+    view = memoryview(data).cast("B")
+    magic, version, header_size = _PREFIX.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("The given data is not a world snapshot.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    header_end = _PREFIX.size + header_size
+    header = pickle.loads(view[_PREFIX.size : header_end])
+    data_start = header_end + _padding(header_end)
+
+    def read_array(ref: BufferRef) -> np.ndarray:
+        offset, size, dtype, shape = ref
+        start = data_start + offset
+        return np.frombuffer(view[start : start + size], dtype=dtype).reshape(shape)
+
+    def read_bytes(ref: BufferRef) -> memoryview:
+        offset, size, _, _ = ref
+        return view[data_start + offset : data_start + offset + size]
+
+    world.commands.clear()
+    world._archetypes.clear()
+    world._entity_archetype.clear()
+    for query in world._queries.values():
+        query.archetypes.clear()
+    world.next_entity_id = header["next_entity_id"]
+    world._generations = read_array(header["generations"]).tolist()
+    world._free_indices = read_array(header["free_indices"]).tolist()
+
+    for archetype_header in header["archetypes"]:
+        archetype = world._get_or_create_archetype(
+            frozenset(archetype_header["signature"])
+        )
+        entities = read_array(archetype_header["entities"]).tolist()
+        archetype.entities = entities
+        archetype._rows = {entity: row for row, entity in enumerate(entities)}
+        world._entity_archetype.update(dict.fromkeys(entities, archetype))
+        for component_, arrays in archetype_header["columnar"].items():
+            column = archetype.columns[component_]
+            column.reserve(len(entities))
+            for name, ref in arrays.items():
+                column.arrays[name][: len(entities)] = read_array(ref)
+            column._length = len(entities)
+        for component_, ref in archetype_header["pickled"].items():
+            archetype.columns[component_].extend(pickle.loads(read_bytes(ref)))
+
+    _reorder_systems(world, header["systems"])
+    return world
+
+
+def load_world(world: "World", file: str | Path) -> "World":
+    """Restore `world` from a file written by `save_world`, using mmap."""
+    with open(file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return restore(world, mapped)
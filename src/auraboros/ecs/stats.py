@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+import threading
+
+
+@dataclass
+class WorldStats:
+    """
+    Counters of a World, readable at runtime through `world.stats`.
+
+    Attributes:
+        spawns: number of created entities.
+        despawns: number of deleted entities.
+        query_hits: number of entities yielded by queries
+            (counted per archetype, not per entity).
+        system_time: seconds each system took in the last `do_systems()`,
+            keyed by the class name of the system.
+        frames: number of `do_systems()` calls.
+    """
+
+    spawns: int = 0
+    despawns: int = 0
+    query_hits: int = 0
+    system_time: dict[str, float] = field(default_factory=dict)
+    frames: int = 0
+    # systems of one stage may run queries concurrently
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def count_query_hits(self, count: int):
+        with self._lock:
+            self.query_hits += count
+
+    def reset(self):
+        self.spawns = 0
+        self.despawns = 0
+        self.query_hits = 0
+        self.system_time.clear()
+        self.frames = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "spawns": self.spawns,
+            "despawns": self.despawns,
+            "query_hits": self.query_hits,
+            "system_time": dict(self.system_time),
+            "frames": self.frames,
+        }
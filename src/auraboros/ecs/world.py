@@ -1,8 +1,25 @@
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass as component  # noqa
 from inspect import isclass
-from typing import Iterable, TypeVar
+from typing import Any, Callable, Iterable, TypeVar
 import logging
+import threading
+
+from .archetype import (
+    Archetype,
+    EntityID,
+    Signature,
+    TypeOfComponent,
+    entity_generation,
+    entity_index,
+    make_entity_id,
+)
+from .columnar import Vector, columnar_component, detach  # noqa
+from .commands import CommandBuffer
+from .query import Query
+from .scheduler import SystemScheduler
+from . import snapshot
+from .stats import WorldStats
 
 CV = TypeVar("CV")
 
@@ -19,13 +36,20 @@ console_handler.setFormatter(console_handler_formatter)
 logger.addHandler(console_handler)
 # ----
 
-# -type aliases-
-EntityID = int
-TypeOfComponent = type
-
 
 class System(metaclass=ABCMeta):
+    """
+    Attributes:
+        reads: component types this system only reads.
+        writes: component types this system modifies.
+            If neither is declared, the system never runs concurrently.
+        order: systems with smaller order run earlier (default 0).
+    """
+
     world: "World"
+    reads: tuple[type, ...] | None = None
+    writes: tuple[type, ...] | None = None
+    order: int = 0
 
     @abstractmethod
     def do(self):
@@ -34,6 +58,16 @@ class System(metaclass=ABCMeta):
 
 class World:
     """
+    Components are stored per archetype: entities which have exactly the same
+    set of component types share one `Archetype` table, and each component
+    type is a dense column in it. Use `get_archetypes` to iterate columns
+    directly instead of looking components up entity by entity.
+
+    Entity ids are recycled: the id of a deleted entity is reused with its
+    generation bumped (see `archetype.make_entity_id`), so a stale id never
+    refers to a new entity and `next_entity_id` only grows with the peak
+    number of live entities.
+
     Type Aliases:
         EntityID = int:
         ComponentID = tnt:
@@ -41,119 +75,310 @@ class World:
 
     def __init__(self):
         self.next_entity_id: EntityID = 0
-        self._entities: dict[EntityID, set[type[CV]]] = {}
-        self._components: dict[type[CV], dict[EntityID, CV]] = {}
+        self._generations: list[int] = []
+        self._free_indices: list[int] = []
+        # systems of one stage may reserve ids concurrently through `commands`
+        self._id_lock = threading.Lock()
+        self._archetypes: dict[Signature, Archetype] = {}
+        self._entity_archetype: dict[EntityID, Archetype] = {}
+        self._queries: dict[tuple[tuple[type, ...], tuple[type, ...]], Query] = {}
         self._systems: list[System] = []
+        self.commands = CommandBuffer(self)
+        self.stats = WorldStats()
+        self.scheduler = SystemScheduler()
 
-    def create_entity(self, *components) -> EntityID:
-        new_entity = self.next_entity_id
-        self._entities[new_entity] = set()
-        for component_ in components:
-            logger.debug(
-                "load component:\n\t" + f"{component_}(type: {component_.__class__})"
+    def _get_or_create_archetype(self, signature: Signature) -> Archetype:
+        if (archetype := self._archetypes.get(signature)) is None:
+            archetype = Archetype(signature, self)
+            self._archetypes[signature] = archetype
+            for query in self._queries.values():
+                query._register_archetype(archetype)
+        return archetype
+
+    def _archetype_without(
+        self, archetype: Archetype, component_: TypeOfComponent
+    ) -> Archetype:
+        if (next_archetype := archetype._edges_remove.get(component_)) is None:
+            next_archetype = self._get_or_create_archetype(
+                archetype.signature - {component_}
+            )
+            archetype._edges_remove[component_] = next_archetype
+            next_archetype._edges_add[component_] = archetype
+        return next_archetype
+
+    def _archetype_with(
+        self, archetype: Archetype, component_: TypeOfComponent
+    ) -> Archetype:
+        if (next_archetype := archetype._edges_add.get(component_)) is None:
+            next_archetype = self._get_or_create_archetype(
+                archetype.signature | {component_}
             )
-            if type(component_) not in self._components.keys():
-                self._components[type(component_)] = {}
-            self._components[type(component_)][new_entity] = component_
-            self._entities[new_entity].add(type(component_))
-        logger.debug(f"result of entity(id:{new_entity}) creation:")
-        logger.debug(f"updated entities:\n\t\t{self._entities}")
-        logger.debug(f"updated components:\n\t\t{self._components}")
-        self.next_entity_id += 1
+            archetype._edges_add[component_] = next_archetype
+            next_archetype._edges_remove[component_] = archetype
+        return next_archetype
+
+    def _reserve_entity_id(self) -> EntityID:
+        with self._id_lock:
+            if self._free_indices:
+                index = self._free_indices.pop()
+                return make_entity_id(index, self._generations[index])
+            new_entity = self.next_entity_id
+            self._generations.append(0)
+            self.next_entity_id += 1
+            return new_entity
+
+    def _reserve_entity_ids(self, count: int) -> list[EntityID]:
+        """Reuse free ids first, then reserve a contiguous range of new ones."""
+        with self._id_lock:
+            reused = self._free_indices[-count:] if count else []
+            del self._free_indices[len(self._free_indices) - len(reused) :]
+            new_entities = [make_entity_id(i, self._generations[i]) for i in reused]
+            rest = count - len(reused)
+            start = self.next_entity_id
+            new_entities.extend(range(start, start + rest))
+            self._generations.extend([0] * rest)
+            self.next_entity_id += rest
+            return new_entities
+
+    def _release_entity_id(self, entity: EntityID):
+        index = entity_index(entity)
+        with self._id_lock:
+            self._generations[index] = entity_generation(entity) + 1
+            self._free_indices.append(index)
+
+    def create_entity(self, *components) -> EntityID:
+        new_entity = self._reserve_entity_id()
+        self._spawn(new_entity, components)
         return new_entity
 
+    def create_entities(
+        self, count: int, *component_factories: Callable[[int], Any]
+    ) -> list[EntityID]:
+        """
+        Create `count` entities in one pass.
+        Each factory is called with the index in the batch (0 to count - 1)
+        and must return a component of the same type on every call.
+
+        Examples:
+            bullets = world.create_entities(
+                100,
+                lambda i: Position(x, y),
+                lambda i: Velocity(math.cos(i), math.sin(i)),
+            )
+        """
+        if count <= 0:
+            return []
+        columns = {}
+        for factory in component_factories:
+            column = [detach(factory(i)) for i in range(count)]
+            columns[type(column[0])] = column
+        new_entities = self._reserve_entity_ids(count)
+        archetype = self._get_or_create_archetype(frozenset(columns))
+        archetype.extend(new_entities, columns)
+        self._entity_archetype.update(dict.fromkeys(new_entities, archetype))
+        self.stats.spawns += count
+        return new_entities
+
+    def _spawn(self, new_entity: EntityID, components):
+        components_by_type = {
+            type(component_): component_
+            for component_ in map(detach, components)
+        }
+        archetype = self._get_or_create_archetype(frozenset(components_by_type))
+        archetype.append(new_entity, components_by_type)
+        self._entity_archetype[new_entity] = archetype
+        self.stats.spawns += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("entity(id:%s) created in %s", new_entity, archetype)
+
     def delete_entity(self, entity: EntityID) -> None:
-        del self._entities[entity]
-        [
-            self._components[component_].__delitem__(entity)
-            for component_ in self._components.keys()
-            if entity in self._components[component_].keys()
-        ]
-        del entity
+        archetype = self._entity_archetype.pop(entity)
+        archetype.pop(entity)
+        self._release_entity_id(entity)
+        self.stats.despawns += 1
+
+    def delete_entities(self, entities: Iterable[EntityID]) -> None:
+        """
+        Delete many entities at once, grouped by archetype.
+        Entities which do not exist (e.g. already deleted) are ignored.
+        """
+        by_archetype: dict[Archetype, list[EntityID]] = {}
+        for entity in entities:
+            if (archetype := self._entity_archetype.pop(entity, None)) is not None:
+                by_archetype.setdefault(archetype, []).append(entity)
+                self._release_entity_id(entity)
+        for archetype, entities_of_archetype in by_archetype.items():
+            archetype.remove_many(entities_of_archetype)
+            self.stats.despawns += len(entities_of_archetype)
+
+    def query(self, *components: type, any_of: Iterable[type] = ()) -> Query:
+        """
+        Return the cached query for entities which have all of `components`
+        and, if `any_of` is given, at least one of `any_of`.
+        The query is registered on first use and kept up to date by the world.
+        """
+        key = (components, tuple(any_of))
+        if (query := self._queries.get(key)) is None:
+            query = Query(*key, stats=self.stats)
+            for archetype in self._archetypes.values():
+                query._register_archetype(archetype)
+            self._queries[key] = query
+        return query
 
     def get_entities(self, *components: type) -> Iterable[EntityID]:
+        """Yield entities which have any of the given component types.
+        Use `query()` to require all of them."""
+        if not components:
+            return iter(())
+        return self.query(any_of=components).entities()
+
+    def get_archetypes(self, *components: type) -> Iterable[Archetype]:
+        """
+        Yield non-empty archetypes which have all of the given component types.
+
+        Examples:
+            for archetype in world.get_archetypes(Position, Velocity):
+                for pos, vel in zip(
+                    archetype.column(Position), archetype.column(Velocity)
+                ):
+                    pos.x += vel.x
+        """
         return (
-            entity
-            for entity in self._entities.keys()
-            if self._entities[entity].intersection(
-                set([component_ for component_ in components])
-            )
+            archetype
+            for archetype in list(self._archetypes.values())
+            if archetype.entities and archetype.signature.issuperset(components)
         )
 
     def has_component(self, entity: EntityID, component_: type) -> bool:
-        return component_ in self._entities[entity]
+        return component_ in self._entity_archetype[entity].signature
 
     def component_for_entity(self, entity: EntityID, component_: type[CV]) -> CV:
         """Get the component for a given entity.
         `edit()` is alias for this method.
         """
-        return self._components[component_][entity]
+        return self._entity_archetype[entity].get(entity, component_)
 
     edit = component_for_entity  # alias for component_for_entity
 
+    def add_component_to(self, entity: EntityID, component_):
+        """Add the component to the entity, replacing one of the same type.
+        A columnar proxy (e.g. from `edit()` of another entity) is copied."""
+        component_ = detach(component_)
+        archetype = self._entity_archetype[entity]
+        component_type = type(component_)
+        if component_type in archetype.signature:
+            archetype.columns[component_type][archetype.row_of(entity)] = component_
+            return
+        next_archetype = self._archetype_with(archetype, component_type)
+        components = archetype.pop(entity)
+        components[component_type] = component_
+        next_archetype.append(entity, components)
+        self._entity_archetype[entity] = next_archetype
+
     def remove_component_of(
         self,
         entity: EntityID,
         component_: type,
     ):
-        self._entities[entity].discard(component_)
-        del self._components[component_][entity]
-        if self._components[component_] == {}:
-            del self._components[component_]
+        archetype = self._entity_archetype[entity]
+        if component_ not in archetype.signature:
+            raise KeyError(component_)
+        next_archetype = self._archetype_without(archetype, component_)
+        components = archetype.pop(entity)
+        del components[component_]
+        next_archetype.append(entity, components)
+        self._entity_archetype[entity] = next_archetype
 
     def add_system(self, system: System):
         if isclass(system):
             raise ValueError("system must be instance")
         system.world = self
         self._systems.append(system)
+        self.scheduler.invalidate()
 
     def remove_system(self, system_type: type[System]) -> None:
         if not isclass(system_type):
             raise ValueError("system_type must be the class")
         else:
-            [
-                self._systems.remove(system)
+            self._systems = [
+                system
                 for system in self._systems
-                if isinstance(system, system_type)
+                if not isinstance(system, system_type)
             ]
+            self.scheduler.invalidate()
 
     def do_systems(self):
-        logger.debug(f"do all systems of {self}")
-        [system.do() for system in self._systems]
+        """
+        Run the systems stage by stage (see `SystemScheduler`), then apply
+        the command buffer. Set `scheduler.max_workers` to run the systems
+        of a stage concurrently.
+        """
+        self.scheduler.run(self._systems, self.stats.system_time)
+        self.commands.apply()
+        self.stats.frames += 1
+
+    def snapshot(self) -> bytes:
+        """
+        Serialise entities, components and system order to bytes.
+        See `ecs.snapshot` for the format and `save_world` for files.
+        """
+        return snapshot.snapshot(self)
+
+    def restore(self, data) -> None:
+        """Restore the state saved by `snapshot()` in place."""
+        snapshot.restore(self, data)
+
+    def debug_dump(self) -> str:
+        """Describe archetypes, queries, systems and stats of this world."""
+        lines = [f"{self}: {len(self._entity_archetype)} entities"]
+        lines += [f"\t{archetype}" for archetype in self._archetypes.values()]
+        lines += [
+            f"\tQuery(all_of={query.all_of}, any_of={query.any_of}): "
+            + f"{len(query.archetypes)} archetypes"
+            for query in self._queries.values()
+        ]
+        system_names = [type(system).__name__ for system in self._systems]
+        lines.append(f"\tsystems: {system_names}")
+        lines.append(f"\tstats: {self.stats.as_dict()}")
+        return "\n".join(lines)
 
     def is_exist(
         self, entity_or_component_or_system: EntityID | TypeOfComponent | type[System]
     ) -> bool:
         if isinstance(entity_or_component_or_system, EntityID):
             logger.debug(
-                f"check existance of {entity_or_component_or_system}"
-                + " in world's entities"
+                "check existance of %s in world's entities",
+                entity_or_component_or_system,
             )
-            return entity_or_component_or_system in self._entities.keys()
+            return entity_or_component_or_system in self._entity_archetype
         elif issubclass(entity_or_component_or_system, System):
             logger.debug(
-                f"check existance of {entity_or_component_or_system}"
-                + " in world's systems"
+                "check existance of %s in world's systems",
+                entity_or_component_or_system,
             )
             return entity_or_component_or_system in self._systems
         elif isclass(entity_or_component_or_system):
             logger.debug(
-                f"check existance of {entity_or_component_or_system}"
-                + " in world's components"
+                "check existance of %s in world's components",
+                entity_or_component_or_system,
+            )
+            return any(
+                archetype.entities
+                for archetype in self._archetypes.values()
+                if entity_or_component_or_system in archetype.signature
             )
-            return entity_or_component_or_system in self._components.keys()
         else:
             raise ValueError("The given argument is not Entity or System or Component.")
 
     # @overload
     # @is_exist.register
     # def is_entity_exist(self, entity: EntityID) -> bool:
-    #     return entity in self._entities.keys()
+    #     return entity in self._entity_archetype
 
     # @overload
     # @is_exist.register
     # def is_component_exist(self, component_: type) -> bool:
-    #     return component_ in self._components.keys()
+    #     return any(component_ in signature for signature in self._archetypes)
 
     # @overload
     # @is_exist.register
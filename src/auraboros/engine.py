@@ -5,6 +5,7 @@ import pygame
 from .core import init  # noqa
 from .core import Global, scale_px_of_pygame_get_surface_display
 from .gamescene import SceneManager
+from .profiler import FrameProfiler
 from .schedule import Schedule, Stopwatch
 from .shader import Shader2D
 
@@ -12,11 +13,57 @@ DeltaTime = float
 PygameEvent = pygame.event.Event
 
 
+class FixedTimestep:
+    """
+    Accumulator of frame time which tells how many fixed simulation steps
+    to run per frame.
+
+    Attributes:
+        step: length of one simulation step in milliseconds.
+        max_steps_per_frame: cap of steps per frame. Time exceeding it is
+            dropped, so a slow frame cannot make the next one even slower
+            (spiral of death); the simulation slows down instead.
+        accumulator: frame time not simulated yet, less than `step`
+            after `advance`.
+    """
+
+    def __init__(self, tick_rate: float = 60, max_steps_per_frame: int = 5):
+        self.step: DeltaTime = 1000 / tick_rate
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator: DeltaTime = 0
+
+    def advance(self, dt: DeltaTime) -> int:
+        """Add a frame time and return the number of steps to simulate."""
+        self.accumulator += dt
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps_per_frame:
+            steps = self.max_steps_per_frame
+            self.accumulator %= self.step
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """
+        How far the rendered frame is between the last simulated step and
+        the next one (0 <= alpha < 1), to interpolate drawn positions.
+        """
+        return self.accumulator / self.step
+
+
 def run(
     scene_manager: SceneManager,
     mod_for_mainloop: Callable = None,
     mod_for_eventloop: Callable = None,
-):
+    fixed_tick_rate: float = None,
+    max_steps_per_frame: int = 5,
+    profiler: FrameProfiler = None,
+    max_frames: int = None,
+    exit_condition: Callable[[], bool] = None,
+    virtual_frame_time: DeltaTime = None,
+    quit_at_exit: bool = True,
+) -> int:
     """
     Args:
         scene_manager (SceneManager): _description_
@@ -28,21 +75,77 @@ def run(
             Append and do given func for eventloop.
             this is useful to provide the engine eventloop section for thirdparty
             pygame package.
+        fixed_tick_rate (float, optional):
+            Simulation steps per second. If given, timers, Schedule,
+            mod_for_mainloop and update run with a fixed dt of
+            1000 / fixed_tick_rate ms as many times as the frame time allows,
+            and the scenes are drawn with `Scene.draw_interpolated`.
+            Otherwise they run once per frame with the frame time.
+        max_steps_per_frame (int):
+            Cap of simulation steps per frame in fixed timestep mode.
+        profiler (FrameProfiler, optional):
+            Records the time of each phase of the frames: "wait" (FPS cap),
+            "timers" (stopwatches), "schedule" (`Schedule.execute`), "events",
+            "update", "draw", "scale" and "present".
+            Its overlay is drawn if `profiler.show_overlay` is True.
+        max_frames (int, optional):
+            Exit after this number of frames.
+        exit_condition (Callable, optional):
+            Called after each frame; exit if it returns True.
+        virtual_frame_time (float, optional):
+            Use this dt (ms) for every frame instead of the measured one,
+            without waiting for the FPS cap, e.g. to replay a simulation
+            deterministically or as fast as possible.
+        quit_at_exit (bool):
+            Call pygame.quit() when the loop ends.
+
+    Returns:
+        int: the number of frames run.
     """
     clock = pygame.time.Clock()
 
     if Global.use_opengl_display:
         shader2d = Shader2D()
 
+    timestep = None
+    if fixed_tick_rate is not None:
+        timestep = FixedTimestep(fixed_tick_rate, max_steps_per_frame)
+
+    if profiler is not None:
+        mark = profiler.mark
+    else:
+
+        def mark(phase: str):
+            pass
+
+    def update_timers(dt: DeltaTime):
+        Stopwatch.update_all_stopwatch(dt)
+        mark("timers")
+        Schedule.execute()
+        mark("schedule")
+
+    def update(dt: DeltaTime):
+        if func := mod_for_mainloop:
+            func(dt)
+        scene_manager.update(dt)
+        mark("update")
+
+    # the frame rate is not capped without a window
+    fps = 0 if Global.is_headless else Global.fps
+    frame_count = 0
     running_flag = True
     while running_flag:
+        if profiler is not None:
+            profiler.begin_frame()
         # -control FPS and return delta time-
-        dt = clock.tick(Global.fps)
-        # --
-        # -update timers-
-        Stopwatch.update_all_stopwatch(dt)
-        Schedule.execute()
+        if virtual_frame_time is None:
+            dt = clock.tick(fps)
+        else:
+            dt = virtual_frame_time
+        mark("wait")
         # --
+        if timestep is None:
+            update_timers(dt)
         # -clear screen surface-
         Global.screen.fill((0, 0, 0))
         # --
@@ -53,12 +156,21 @@ def run(
             if func := mod_for_eventloop:
                 func(event)
             #  --
-        if func := mod_for_mainloop:
-            func(dt)
-        scene_manager.update(dt)
-        scene_manager.draw(Global.screen)
+        mark("events")
+        if timestep is None:
+            update(dt)
+            scene_manager.draw(Global.screen)
+        else:
+            for _ in range(timestep.advance(dt)):
+                update_timers(timestep.step)
+                update(timestep.step)
+            scene_manager.draw(Global.screen, timestep.alpha)
+        if profiler is not None and profiler.show_overlay:
+            profiler.draw_overlay(Global.screen)
+        mark("draw")
         # --
         scale_px_of_pygame_get_surface_display()
+        mark("scale")
         if Global.use_opengl_display:
             # -render opengl-
             shader2d.register_surface_as_texture(
@@ -70,7 +182,17 @@ def run(
             # -update display-
             pygame.display.flip()
             # --
-        else:
+        elif not Global.is_headless:
             pygame.display.update()
+        mark("present")
+        if profiler is not None:
+            profiler.end_frame()
+        frame_count += 1
+        if max_frames is not None and frame_count >= max_frames:
+            running_flag = False
+        if exit_condition is not None and exit_condition():
+            running_flag = False
 
-    pygame.quit()
+    if quit_at_exit:
+        pygame.quit()
+    return frame_count
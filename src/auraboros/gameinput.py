@@ -9,7 +9,7 @@ from typing import Callable, Optional, Union
 
 import pygame
 
-from .schedule import Stopwatch
+from .schedule import LazyStopwatch
 from .gametext import split_multiline_text, len_str_contain_fullwidth_char
 from .utils.string import is_char_fullwidth
 
@@ -24,12 +24,12 @@ class KeyAction:
     is_keydown_enabled: bool = True
     is_keyup_enabled: bool = True
     _is_pressed: bool = False
-    _input_timer: Stopwatch = None
+    _input_timer: LazyStopwatch = None
     _is_delayinput_finished: bool = False
     _is_firstinterval_finished: bool = False
 
     def __post_init__(self):
-        self._input_timer = Stopwatch()
+        self._input_timer = LazyStopwatch()
 
 
 class Keyboard:
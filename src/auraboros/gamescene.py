@@ -74,6 +74,15 @@ class Scene:
     def draw(self, screen: pygame.surface.Surface):
         pass
 
+    def draw_interpolated(self, screen: pygame.surface.Surface, alpha: float):
+        """
+        Called instead of `draw` when the engine runs with a fixed timestep.
+        `alpha` (0 <= alpha < 1) is how far the frame is between the last
+        `update` and the next one, to draw e.g. `prev + (pos - prev) * alpha`.
+        Calls `draw` by default.
+        """
+        self.draw(screen)
+
     def update(self, dt):
         pass
 
@@ -115,10 +124,13 @@ class SceneManager:
                 self.scenes[0]._is_setup_finished = True
         self.scenes[self.current].update(dt)
 
-    def draw(self, screen: pygame.surface.Surface):
+    def draw(self, screen: pygame.surface.Surface, alpha: float = None):
         if self.scenes == []:
             return
-        self.scenes[self.current].draw(screen)
+        if alpha is None:
+            self.scenes[self.current].draw(screen)
+        else:
+            self.scenes[self.current].draw_interpolated(screen, alpha)
 
     def add(self, scene: Scene):
         self.scenes.append(scene)
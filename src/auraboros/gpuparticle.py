@@ -0,0 +1,281 @@
+from typing import Any
+
+import moderngl
+import numpy as np
+
+from .particle import (
+    VelocityProgram,
+    random_angle_diffusion_velocities,
+    saltire_diffusion_velocities,
+)
+from .schedule import LazyStopwatch, Stopwatch
+from .shader import ProgramCache
+
+UPDATE_VERTEX = """
+#version 330 core
+
+uniform float dt;
+
+in vec2 in_pos;
+in vec2 in_vel;
+in float in_age;
+in float in_life;
+
+out vec2 out_pos;
+out vec2 out_vel;
+out float out_age;
+out float out_life;
+
+void main() {
+    bool alive = in_life < 0.0 || in_age < in_life;
+    out_pos = alive ? in_pos + in_vel : in_pos;
+    out_vel = in_vel;
+    out_age = in_age + dt;
+    out_life = in_life;
+}
+"""
+
+DRAW_VERTEX = """
+#version 330 core
+
+uniform vec2 viewport;
+uniform float point_size;
+
+in vec2 in_pos;
+in float in_age;
+in float in_life;
+
+void main() {
+    bool alive = in_life < 0.0 || in_age < in_life;
+    gl_Position = alive
+        ? vec4(in_pos.x / viewport.x * 2.0 - 1.0, 1.0 - in_pos.y / viewport.y * 2.0,
+               0.0, 1.0)
+        : vec4(2.0, 2.0, 2.0, 1.0);  // clipped
+    gl_PointSize = point_size;
+}
+"""
+
+DRAW_FRAGMENT = """
+#version 330 core
+
+uniform vec4 color;
+
+out vec4 frag_color;
+
+void main() {
+    if (length(gl_PointCoord - 0.5) > 0.5) {
+        discard;
+    }
+    frag_color = color;
+}
+"""
+
+_VARYINGS = ("out_pos", "out_vel", "out_age", "out_life")
+_FLOATS_PER_PARTICLE = 6  # pos (2), vel (2), age, life
+_STRIDE = _FLOATS_PER_PARTICLE * 4
+
+
+class GPUEmitter:
+    """
+    Emitter whose particles live in GPU buffers and are moved by a vertex
+    shader with transform feedback, for hundreds of thousands of particles.
+
+    The parameters and methods follow `VectorizedEmitter`, and the velocity
+    programs are the same NumPy functions; only the velocities of newly
+    emitted particles are computed on the CPU and written into a ring of
+    `capacity` slots, so when it is full the oldest particles are replaced.
+    `update()` moves every particle by its velocity in one transform
+    feedback pass between two buffers, and `draw()` renders them as round
+    points in one call. Ages are in milliseconds of the emitter's lazy
+    stopwatch, like `VectorizedEmitter`.
+
+    Examples:
+        emitter = GPUEmitter(shader2d.ctx, program_cache=shader2d.program_cache)
+        emitter.emit_per_update = 500
+        emitter.let_emit()
+        ...
+        emitter.update()
+        shader2d.ctx.enable(moderngl.BLEND)  # for a translucent particle_color
+        emitter.draw(pygame.display.get_window_size())
+
+    Attributes:
+        capacity: number of particle slots on the GPU.
+        particle_size: radius in pixels of the points.
+        particle_color: RGB(A) color of the points, 0-255.
+    """
+
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        capacity: int = 100_000,
+        seed=None,
+        program_cache: ProgramCache | None = None,
+    ):
+        self.ctx = ctx
+        self.x = 0
+        self.y = 0
+        self.lifetime = 2000  # -1 means endless lifetime.
+        self.how_many_emit = -1  # -1 means endless during lifetime.
+        self.emit_per_update = 1
+        self.emitted_counter = 0
+        self.is_emitting = False
+        self.particle_lifetime = 2000  # -1 means endless lifetime.
+        self.particle_size = 3
+        self.particle_color = (255, 255, 255)
+        self.rng = np.random.default_rng(seed)
+        self._lifetimer = Stopwatch()
+        self._clock = LazyStopwatch()
+        self._clock.start()
+        self._last_update_time = 0.0
+        self._last_death_time = 0.0  # clock time when all particles are dead
+        self.particle_programs: dict[Any, VelocityProgram] = {
+            "saltire_diffusion": saltire_diffusion_velocities,
+            "random_angle_diffusion": random_angle_diffusion_velocities,
+        }
+        self.current_program_name = "random_angle_diffusion"
+
+        self._owns_program_cache = program_cache is None
+        if program_cache is None:
+            program_cache = ProgramCache(ctx)
+        self.program_cache = program_cache
+        self.capacity = capacity
+        self._buffers = [ctx.buffer(reserve=capacity * _STRIDE) for _ in range(2)]
+        for buffer in self._buffers:
+            buffer.clear()  # life 0: every slot starts dead
+        self._current = 0
+        self._update_program = program_cache.get(UPDATE_VERTEX, varyings=_VARYINGS)
+        self._draw_program = program_cache.get(DRAW_VERTEX, DRAW_FRAGMENT)
+        self._update_vaos = [
+            ctx.vertex_array(
+                self._update_program,
+                [(buffer, "2f 2f 1f 1f", "in_pos", "in_vel", "in_age", "in_life")],
+            )
+            for buffer in self._buffers
+        ]
+        self._draw_vaos = [
+            ctx.vertex_array(
+                self._draw_program,
+                [(buffer, "2f 8x 1f 1f", "in_pos", "in_age", "in_life")],
+            )
+            for buffer in self._buffers
+        ]
+
+    @property
+    def used_slots(self) -> int:
+        """Slots which have held a particle; only these are simulated."""
+        return min(self.emitted_counter, self.capacity)
+
+    def register_particle_program(self, program: VelocityProgram, program_name):
+        self.particle_programs[program_name] = program
+
+    def set_current_program(self, program_name):
+        self.current_program_name = program_name
+
+    def let_emit(self):
+        if not self.is_emitting:
+            self._lifetimer.start()
+        self.is_emitting = True
+
+    def let_freeze(self):
+        if self.is_emitting:
+            self._lifetimer.stop()
+        self.is_emitting = False
+
+    def reset(self):
+        for buffer in self._buffers:
+            buffer.clear()
+        self.emitted_counter = 0
+        self._last_death_time = 0.0
+        self._lifetimer.reset()
+
+    def reset_lifetime_count(self):
+        self._lifetimer.reset()
+
+    def is_lifetime_end(self) -> bool:
+        return self._lifetimer.read() >= self.lifetime
+
+    def is_particles_lifetime_end(self) -> bool:
+        return self._clock.read() >= self._last_death_time
+
+    def emit(self, count: int):
+        """Emit `count` particles at the position of the emitter."""
+        count = min(count, self.capacity)
+        particles = np.empty((count, _FLOATS_PER_PARTICLE), np.float32)
+        particles[:, 0:2] = (self.x, self.y)
+        particles[:, 2:4] = self.particle_programs[self.current_program_name](
+            count, self.rng
+        )
+        particles[:, 4] = 0.0
+        particles[:, 5] = self.particle_lifetime
+        if self.particle_lifetime < 0:
+            self._last_death_time = np.inf
+        else:
+            self._last_death_time = max(
+                self._last_death_time, self._clock.read() + self.particle_lifetime
+            )
+        buffer = self._buffers[self._current]
+        start = self.emitted_counter % self.capacity
+        head = min(count, self.capacity - start)
+        buffer.write(particles[:head], offset=start * _STRIDE)
+        if head < count:  # wrap around the ring
+            buffer.write(particles[head:], offset=0)
+        self.emitted_counter += count
+
+    def update(self):
+        if self.is_emitting:
+            if not self.is_lifetime_end() or self.lifetime < 0:
+                count = self.emit_per_update
+                if self.how_many_emit >= 0:
+                    count = min(count, self.how_many_emit - self.emitted_counter)
+                if count > 0:
+                    self.emit(count)
+        now = self._clock.read()
+        dt, self._last_update_time = now - self._last_update_time, now
+        if self.used_slots == 0:
+            return
+        self._update_program["dt"].value = dt
+        self._update_vaos[self._current].transform(
+            self._buffers[1 - self._current],
+            mode=moderngl.POINTS,
+            vertices=self.used_slots,
+        )
+        self._current = 1 - self._current
+
+    def draw(self, viewport: tuple[int, int]):
+        """
+        Render the particles to the current framebuffer. The enable flags
+        and the blend function of the context are left to the caller;
+        enable moderngl.BLEND for a translucent `particle_color`.
+        """
+        if self.used_slots == 0:
+            return
+        color = tuple(channel / 255 for channel in self.particle_color)
+        point_size = self.particle_size * 2 + 1
+        self._draw_program["viewport"].value = tuple(viewport)
+        self._draw_program["point_size"].value = point_size
+        self._draw_program["color"].value = (color + (1.0,))[:4]
+        # the shader's gl_PointSize is used with PROGRAM_POINT_SIZE enabled,
+        # the context's point size without; the latter can be restored
+        previous_point_size = self.ctx.point_size
+        self.ctx.point_size = point_size
+        self._draw_vaos[self._current].render(
+            moderngl.POINTS, vertices=self.used_slots
+        )
+        self.ctx.point_size = previous_point_size
+
+    def read_particles(self) -> np.ndarray:
+        """
+        Copy the used slots back from the GPU, as a float array of shape
+        (used_slots, 6): x, y, vx, vy, age, lifetime. Slow; for tests and
+        debugging.
+        """
+        data = self._buffers[self._current].read(size=self.used_slots * _STRIDE)
+        return np.frombuffer(data, np.float32).reshape(-1, _FLOATS_PER_PARTICLE)
+
+    def release(self):
+        for vao in self._update_vaos + self._draw_vaos:
+            vao.release()
+        for buffer in self._buffers:
+            buffer.release()
+        if self._owns_program_cache:
+            self.program_cache.clear()
@@ -0,0 +1,138 @@
+from pathlib import Path
+from time import perf_counter_ns
+from typing import IO
+import json
+
+import numpy as np
+import pygame
+
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """
+    Measures how long each phase of a frame takes, keeping the last
+    `capacity` frames in ring buffers.
+
+    The main loop calls `begin_frame()`, then `mark(phase)` right after each
+    phase, which charges the time since the previous mark (or the frame
+    start) to that phase; `end_frame()` records the whole frame as "frame".
+    A phase marked several times in a frame (e.g. fixed timestep updates)
+    accumulates. Times are measured with `perf_counter_ns` and reported in
+    milliseconds.
+
+    Examples:
+        profiler = FrameProfiler()
+        engine.run(scene_manager, profiler=profiler)
+        ...
+        profiler.dump("frames.json")
+
+    Attributes:
+        capacity: number of frames kept.
+        show_overlay: whether `engine.run` draws `draw_overlay` on the screen.
+        frame_count: number of recorded frames.
+    """
+
+    def __init__(self, capacity: int = 240, show_overlay: bool = False):
+        self.capacity = capacity
+        self.show_overlay = show_overlay
+        self.frame_count = 0
+        self._samples: dict[str, np.ndarray] = {}  # ns, row = frame % capacity
+        self._frame_start = 0
+        self._last_mark = 0
+        self._font: pygame.font.Font | None = None
+
+    @property
+    def phases(self) -> list[str]:
+        return list(self._samples)
+
+    def begin_frame(self):
+        slot = self.frame_count % self.capacity
+        for samples in self._samples.values():
+            samples[slot] = 0
+        self._frame_start = self._last_mark = perf_counter_ns()
+
+    def mark(self, phase: str):
+        now = perf_counter_ns()
+        self.record(phase, now - self._last_mark)
+        self._last_mark = now
+
+    def record(self, phase: str, duration_ns: int):
+        """Add a duration to a phase of the current frame."""
+        if (samples := self._samples.get(phase)) is None:
+            samples = self._samples[phase] = np.zeros(self.capacity, np.int64)
+        samples[self.frame_count % self.capacity] += duration_ns
+
+    def end_frame(self):
+        self.record("frame", perf_counter_ns() - self._frame_start)
+        self.frame_count += 1
+
+    def clear(self):
+        self._samples.clear()
+        self.frame_count = 0
+
+    def samples(self, phase: str) -> np.ndarray:
+        """Durations of a phase in ms over the recorded frames, oldest first."""
+        samples = self._samples[phase]
+        if self.frame_count < self.capacity:
+            samples = samples[: self.frame_count]
+        else:
+            samples = np.roll(samples, -(self.frame_count % self.capacity))
+        return samples / 1e6
+
+    def stats(self, phase: str) -> dict[str, float]:
+        """mean, max and the `PERCENTILES` of a phase in milliseconds."""
+        samples = self.samples(phase)
+        if len(samples) == 0:
+            return {}
+        stats = {"mean": float(samples.mean()), "max": float(samples.max())}
+        for percentile, value in zip(
+            PERCENTILES, np.percentile(samples, PERCENTILES)
+        ):
+            stats[f"p{percentile}"] = float(value)
+        return stats
+
+    def report(self) -> dict:
+        return {
+            "frames": min(self.frame_count, self.capacity),
+            "phases": {phase: self.stats(phase) for phase in self._samples},
+        }
+
+    def dump(self, file: str | Path | IO[str], include_samples: bool = False):
+        """Write `report()` as JSON, optionally with the raw samples."""
+        report = self.report()
+        if include_samples:
+            report["samples"] = {
+                phase: self.samples(phase).tolist() for phase in self._samples
+            }
+        if isinstance(file, (str, Path)):
+            with open(file, "w") as f:
+                json.dump(report, f, indent=2)
+        else:
+            json.dump(report, file, indent=2)
+
+    def draw_overlay(
+        self,
+        surface: pygame.surface.Surface,
+        pos: tuple[int, int] = (0, 0),
+        font: pygame.font.Font | None = None,
+    ):
+        """Draw the p50/p95/p99 of every phase as a table of text lines."""
+        if font is None:
+            if self._font is None:
+                pygame.font.init()  # not at import, to start no subsystem early
+                self._font = pygame.font.Font(None, 16)
+            font = self._font
+        x, y = pos
+        lines = ["phase       p50   p95   p99"]
+        for phase in self._samples:
+            stats = self.stats(phase)
+            if stats:
+                lines.append(
+                    f"{phase:<10}"
+                    + "".join(f"{stats[f'p{p}']:6.2f}" for p in PERCENTILES)
+                )
+        for line in lines:
+            text = font.render(line, False, (255, 255, 255), (0, 0, 0))
+            surface.blit(text, (x, y))
+            y += text.get_height()
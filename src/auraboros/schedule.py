@@ -1,6 +1,9 @@
 from collections import OrderedDict
+from enum import Enum, auto
+from heapq import heappop, heappush
 from numbers import Number
-from typing import Callable, TypeAlias, Union
+from typing import Callable, Union
+from weakref import WeakSet
 
 import pygame
 
@@ -58,12 +61,39 @@ class StopwatchOld:
             instance.update()
 
 
+class GameClock:
+    """
+    Game time in milliseconds shared by all timers.
+    It is advanced once per frame by `Stopwatch.update_all_stopwatch`.
+    """
+
+    time: float = 0
+
+    def __init__(self):
+        raise Exception("GameClock cannot be instantiated.")
+
+    @classmethod
+    def advance(cls, dt):
+        cls.time += dt
+
+
 class Stopwatch:
-    _instances: list["Stopwatch"] = []
+    """
+    Stopwatch counting the time given to `update_all_stopwatch`.
+
+    Stopwatches are registered weakly, so a stopwatch that is no longer
+    referenced is dropped from the registry. Only stopwatches that count
+    time (running, or counting pausing time) are kept in the active set that
+    `update_all_stopwatch` iterates, so idle ones cost nothing per frame.
+    Call `dispose()` to unregister a stopwatch explicitly.
+    """
+
+    _instances: WeakSet["Stopwatch"] = WeakSet()
+    _active: WeakSet["Stopwatch"] = WeakSet()
 
     def __init__(self):
         self.initialize()
-        Stopwatch._instances.append(self)
+        Stopwatch._instances.add(self)
 
     def initialize(self):
         self._started: bool = False
@@ -72,6 +102,7 @@ class Stopwatch:
         self._pausetime: int = 0
         self._is_running: bool = False
         self._is_pausetime_enabled = False
+        Stopwatch._active.discard(self)
 
     def reset(self):
         self._time = 0
@@ -79,6 +110,7 @@ class Stopwatch:
 
     def start(self):
         self._is_running = True
+        Stopwatch._active.add(self)
 
     def update(self, dt):
         if self._is_running:
@@ -88,12 +120,24 @@ class Stopwatch:
 
     def stop(self):
         self._is_running = False
+        if not self._is_pausetime_enabled:
+            Stopwatch._active.discard(self)
 
     def enable_pausing_time_count(self):
         self._is_pausetime_enabled = True
+        Stopwatch._active.add(self)
 
     def disable_pausing_time_count(self):
         self._is_pausetime_enabled = False
+        if not self._is_running:
+            Stopwatch._active.discard(self)
+
+    def dispose(self):
+        """Unregister this stopwatch. It is not updated anymore."""
+        self._is_running = False
+        self._is_pausetime_enabled = False
+        Stopwatch._instances.discard(self)
+        Stopwatch._active.discard(self)
 
     def read(self):
         return self._time
@@ -106,72 +150,504 @@ class Stopwatch:
 
     @classmethod
     def update_all_stopwatch(cls, dt):
-        for instance in cls._instances:
+        GameClock.advance(dt)
+        for instance in cls._active:
             instance.update(dt)
 
 
-ItemOfScheduleList: TypeAlias = dict[str, Union[Callable, Number, Stopwatch]]
+class LazyStopwatch:
+    """
+    Stopwatch with the same interface as `Stopwatch`, which records
+    the `GameClock` time when it starts and stops instead of accumulating
+    `dt` every frame. `read()` computes the time on demand, so any number of
+    these cost nothing per frame; they need no registration either.
+    """
+
+    def __init__(self):
+        self.initialize()
+
+    def initialize(self):
+        self._time: float = 0  # time counted before `_starttime`
+        self._starttime: float = 0
+        self._pausetime: float = 0  # pausing time counted before `_stoptime`
+        self._stoptime: float = 0
+        self._is_running: bool = False
+        self._is_pausetime_enabled = False
+
+    def _is_counting_pausetime(self) -> bool:
+        return (
+            not self._is_running and self._is_pausetime_enabled and self._time != 0
+        )
+
+    def reset(self):
+        self._time = 0
+        self._pausetime = 0
+        self._starttime = self._stoptime = GameClock.time
+
+    def start(self):
+        if not self._is_running:
+            self._pausetime = self.read_pausing()
+            self._starttime = GameClock.time
+            self._is_running = True
+
+    def update(self, dt):
+        """Does nothing. Kept for compatibility with `Stopwatch`."""
+
+    def stop(self):
+        if self._is_running:
+            self._time = self.read()
+            self._stoptime = GameClock.time
+            self._is_running = False
+
+    def enable_pausing_time_count(self):
+        if not self._is_pausetime_enabled:
+            self._stoptime = GameClock.time
+            self._is_pausetime_enabled = True
+
+    def disable_pausing_time_count(self):
+        self._pausetime = self.read_pausing()
+        self._is_pausetime_enabled = False
+
+    def dispose(self):
+        """Does nothing. Kept for compatibility with `Stopwatch`."""
+
+    def read(self):
+        if self._is_running:
+            return self._time + GameClock.time - self._starttime
+        return self._time
+
+    def read_pausing(self):
+        if self._is_counting_pausetime():
+            return self._pausetime + GameClock.time - self._stoptime
+        return self._pausetime
+
+    def is_playing(self):
+        return self._is_running
+
+
+class SchedulePolicy(Enum):
+    """
+    What a job does when a frame overshoots its due time.
+
+    FIRE_ONCE: call once and count the next interval from the current time,
+        so the overshoot is lost (the historical behaviour).
+    CATCH_UP: call once per missed interval, up to `max_catch_up` times
+        per execute, keeping the phase. Suits spawners and simulation steps.
+    PHASE_PRESERVING: call once but carry the overshoot into the next
+        interval, so calls stay on the grid of `interval`. Missed intervals
+        are skipped. Suits animations.
+    """
+
+    FIRE_ONCE = auto()
+    CATCH_UP = auto()
+    PHASE_PRESERVING = auto()
+
+
+DEFAULT_MAX_CATCH_UP = 8
+
+
+class ScheduledJob:
+    """
+    A function registered to `Schedule`. `Schedule.add` returns it as
+    a handle which can be given to the other methods instead of the function.
+
+    Attributes:
+        func: the scheduled function.
+        interval: interval of calls in milliseconds.
+        policy: how overshoots of the due time are handled.
+        max_catch_up: cap of calls per execute with `SchedulePolicy.CATCH_UP`.
+        is_active: whether the interval timer is running.
+        due: GameClock time of the next call (meaningful while active).
+        remaining: time left until the next call (meaningful while inactive).
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        interval: Number,
+        policy: SchedulePolicy = SchedulePolicy.FIRE_ONCE,
+        max_catch_up: int = DEFAULT_MAX_CATCH_UP,
+    ):
+        self.func = func
+        self.interval = interval
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.is_active = False
+        self.due: float = 0
+        self.remaining: float = interval
+        self._version = 0  # bumped whenever `due` changes or the job stops
+
+    def __repr__(self) -> str:
+        return (
+            f"ScheduledJob({self.func!r}, interval={self.interval}, "
+            + f"policy={self.policy.name}, is_active={self.is_active})"
+        )
+
+    def time_left(self) -> float:
+        return max(0, self.due - GameClock.time) if self.is_active else self.remaining
+
+    def missed_intervals(self, now: float) -> int:
+        """Number of due times passed by `now`, counting `due` itself."""
+        if self.interval <= 0:
+            return 1
+        return int((now - self.due) // self.interval) + 1
+
+    def _next_due(self, now: float) -> float:
+        if self.policy is SchedulePolicy.FIRE_ONCE or self.interval <= 0:
+            return now + self.interval
+        return self.due + self.interval * self.missed_intervals(now)
+
+
+class ScheduleBackend:
+    """
+    Keeps the jobs of `Schedule` and decides which of them are due.
+    The base class implements the bookkeeping shared by all backends;
+    subclasses implement how active jobs are queued.
+    """
+
+    def __init__(self):
+        self.jobs: dict[Callable, ScheduledJob] = {}
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def _enqueue(self, job: ScheduledJob):
+        """Called after an active job got a new `due`."""
+        raise NotImplementedError
+
+    def _enqueue_many(self, jobs: list[ScheduledJob]):
+        for job in jobs:
+            self._enqueue(job)
+
+    def _dequeue(self, job: ScheduledJob):
+        """Called after a job was deactivated or removed."""
+
+    def _pop_due_jobs(self, now: float) -> list[ScheduledJob]:
+        """Return the active jobs whose `due` <= now, in order of `due`."""
+        raise NotImplementedError
+
+    def add(
+        self,
+        func: Callable,
+        interval: Number,
+        policy: SchedulePolicy = SchedulePolicy.FIRE_ONCE,
+        max_catch_up: int = DEFAULT_MAX_CATCH_UP,
+    ) -> ScheduledJob:
+        if (old_job := self.jobs.get(func)) is not None:
+            self.remove(old_job)
+        job = ScheduledJob(func, interval, policy, max_catch_up)
+        self.jobs[func] = job
+        return job
+
+    def adopt(self, jobs: list[ScheduledJob]):
+        """Take over jobs of another backend."""
+        for job in jobs:
+            self.jobs[job.func] = job
+            if job.is_active:
+                job._version += 1
+                self._enqueue(job)
+
+    def remove(self, job: ScheduledJob):
+        if self.jobs.get(job.func) is job:
+            del self.jobs[job.func]
+        if job.is_active:
+            job.remaining = job.time_left()
+            job.is_active = False
+            job._version += 1
+            self._dequeue(job)
+
+    def activate(self, job: ScheduledJob):
+        if not job.is_active:
+            job.is_active = True
+            self._set_due(job, GameClock.time + job.remaining)
+
+    def deactivate(self, job: ScheduledJob):
+        if job.is_active:
+            job.remaining = job.time_left()
+            job.is_active = False
+            job._version += 1
+            self._dequeue(job)
+
+    def reset(self, job: ScheduledJob):
+        if job.is_active:
+            self._set_due(job, GameClock.time + job.interval)
+        else:
+            job.remaining = job.interval
+
+    def change_interval(self, job: ScheduledJob, interval: Number):
+        elapsed = job.interval - job.time_left()
+        job.interval = interval
+        if job.is_active:
+            self._set_due(job, GameClock.time + max(0, interval - elapsed))
+        else:
+            job.remaining = max(0, interval - elapsed)
+
+    def _set_due(self, job: ScheduledJob, due: float):
+        job.due = due
+        job._version += 1
+        self._enqueue(job)
+
+    @staticmethod
+    def _catch_up(job: ScheduledJob, version: int, now: float):
+        """Repeat the call of a CATCH_UP job for its other missed intervals."""
+        for _ in range(min(job.missed_intervals(now), job.max_catch_up) - 1):
+            if not job.is_active or job._version != version:
+                break
+            job.func()
+
+    def execute(self):
+        now = GameClock.time
+        fired = []
+        catch_up = SchedulePolicy.CATCH_UP
+        for job in self._pop_due_jobs(now):
+            version = job._version
+            job.func()
+            if job.policy is catch_up:
+                self._catch_up(job, version, now)
+            fired.append((job, version))
+        # rescheduled after all calls, so a job is called once per execute
+        # even if its interval is 0
+        fire_once = SchedulePolicy.FIRE_ONCE
+        rescheduled = []
+        for job, version in fired:
+            if job.is_active and job._version == version:
+                if job.policy is fire_once:
+                    job.due = now + job.interval
+                else:
+                    job.due = job._next_due(now)
+                job._version += 1
+                rescheduled.append(job)
+        self._enqueue_many(rescheduled)
+
+
+class ListScheduleBackend(ScheduleBackend):
+    """Checks every job on every execute. Cheap with a few jobs."""
+
+    def _enqueue(self, job: ScheduledJob):
+        pass
+
+    def _enqueue_many(self, jobs: list[ScheduledJob]):
+        pass
+
+    def _pop_due_jobs(self, now: float) -> list[ScheduledJob]:
+        due_jobs = [
+            job for job in self.jobs.values() if job.is_active and job.due <= now
+        ]
+        for job in due_jobs:
+            job._version += 1
+        return sorted(due_jobs, key=lambda job: job.due)
+
+
+class HeapScheduleBackend(ScheduleBackend):
+    """
+    Keeps the distinct due times of active jobs in a min-heap and the jobs
+    in a dict of due time -> jobs, so execute costs O(due times * log n)
+    and jobs sharing a due time (common with frame-aligned intervals) cost
+    one heap entry. Jobs whose due time changes are queued again and
+    their outdated entries are skipped when popped.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._heap: list[float] = []
+        self._buckets: dict[float, list[tuple[ScheduledJob, int]]] = {}
+        self._entry_count = 0  # including outdated entries
+
+    def _enqueue(self, job: ScheduledJob):
+        if (bucket := self._buckets.get(job.due)) is None:
+            bucket = self._buckets[job.due] = []
+            heappush(self._heap, job.due)
+        bucket.append((job, job._version))
+        self._entry_count += 1
+
+    def _enqueue_many(self, jobs: list[ScheduledJob]):
+        buckets, heap = self._buckets, self._heap
+        for job in jobs:
+            if (bucket := buckets.get(job.due)) is None:
+                bucket = buckets[job.due] = []
+                heappush(heap, job.due)
+            bucket.append((job, job._version))
+        self._entry_count += len(jobs)
+
+    def _compact(self):
+        self._heap = []
+        self._buckets = {}
+        self._entry_count = 0
+        for job in self.jobs.values():
+            if job.is_active:
+                self._enqueue(job)
+
+    def _pop_due_jobs(self, now: float) -> list[ScheduledJob]:
+        if self._entry_count > 2 * len(self.jobs) + 64:
+            self._compact()
+        heap = self._heap
+        due_jobs = []
+        while heap and heap[0] <= now:
+            bucket = self._buckets.pop(heappop(heap))
+            self._entry_count -= len(bucket)
+            for job, version in bucket:
+                if job.is_active and version == job._version:
+                    job._version += 1
+                    due_jobs.append(job)
+        return due_jobs
+
+
+class TimingWheelScheduleBackend(ScheduleBackend):
+    """
+    Hierarchical timing wheel: `levels` wheels of `2 ** slot_bits` slots,
+    where a slot of level n spans `2 ** (slot_bits * n)` ticks of `tick`
+    milliseconds. Jobs are put in a slot in O(1) and cascaded down to finer
+    wheels as their due time approaches, so queuing costs the same however
+    many jobs there are. It suits very large numbers of short-interval,
+    often rescheduled jobs (e.g. hundreds of animations); execute also visits
+    one slot per elapsed tick, so keep `tick` near the timer resolution
+    actually needed.
+    """
+
+    def __init__(self, tick: float = 1.0, slot_bits: int = 6, levels: int = 4):
+        super().__init__()
+        self.tick = tick
+        self._bits = slot_bits
+        self._mask = (1 << slot_bits) - 1
+        self._wheels: list[list[list[tuple[ScheduledJob, int]]]] = [
+            [[] for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._overflow: list[tuple[ScheduledJob, int]] = []
+        self._ready: list[tuple[ScheduledJob, int]] = []
+        self._current_tick = int(GameClock.time // tick)
+        self._entry_count = 0  # including outdated entries
+
+    def _enqueue(self, job: ScheduledJob):
+        self._place((job, job._version))
+        self._entry_count += 1
+
+    def _place(self, entry: tuple[ScheduledJob, int]):
+        due_tick = int(entry[0].due // self.tick)
+        delta = due_tick - self._current_tick
+        if delta <= 0:
+            self._ready.append(entry)
+            return
+        for level, wheel in enumerate(self._wheels):
+            if delta < 1 << (self._bits * (level + 1)):
+                wheel[(due_tick >> (self._bits * level)) & self._mask].append(entry)
+                return
+        self._overflow.append(entry)
+
+    def _advance_tick(self) -> list[tuple[ScheduledJob, int]]:
+        self._current_tick += 1
+        tick = self._current_tick
+        for level in range(1, len(self._wheels) + 1):
+            if tick & ((1 << (self._bits * level)) - 1):
+                break
+            if level == len(self._wheels):
+                entries, self._overflow = self._overflow, []
+            else:
+                slots = self._wheels[level]
+                index = (tick >> (self._bits * level)) & self._mask
+                entries, slots[index] = slots[index], []
+            for entry in entries:
+                self._place(entry)
+        slots = self._wheels[0]
+        entries, slots[tick & self._mask] = slots[tick & self._mask], []
+        return entries
+
+    def _pop_due_jobs(self, now: float) -> list[ScheduledJob]:
+        now_tick = int(now // self.tick)
+        if self._entry_count == 0:
+            self._current_tick = max(self._current_tick, now_tick)
+            return []
+        candidates = []
+        while self._current_tick < now_tick:
+            candidates += self._advance_tick()
+        # `_ready` also receives entries cascaded down at their due tick
+        candidates += self._ready
+        self._ready = []
+        due_jobs = []
+        for entry in candidates:
+            job, version = entry
+            if not job.is_active or version != job._version:
+                self._entry_count -= 1
+            elif job.due <= now:
+                self._entry_count -= 1
+                job._version += 1
+                due_jobs.append(job)
+            else:
+                # due later within the current tick
+                self._ready.append(entry)
+        due_jobs.sort(key=lambda job: job.due)
+        return due_jobs
 
 
 class Schedule:
     """指定した時間間隔で関数を実行するためのスケジュール機能を提供するクラス
-    _schedule_list = [func, interval, last_time, added_time, is_active]
+
+    Jobs are kept by `backend` (a min-heap by default, see
+    `HeapScheduleBackend`) and timed with `GameClock`. Functions are looked
+    up in a dict, and the `ScheduledJob` returned by `add` can be given to
+    the other methods instead of the function.
     """
 
-    _schedule_list: list[ItemOfScheduleList] = []
+    backend: ScheduleBackend = HeapScheduleBackend()
 
     @classmethod
-    def add(cls, func: Callable, interval: Number):
+    def use_backend(cls, backend: ScheduleBackend):
+        """Switch the backend, moving the registered jobs to the new one."""
+        backend.adopt(list(cls.backend.jobs.values()))
+        cls.backend = backend
+
+    @classmethod
+    def _job_of(cls, func_or_job: Callable | ScheduledJob) -> ScheduledJob:
+        if isinstance(func_or_job, ScheduledJob):
+            return func_or_job
+        return cls.backend.jobs[func_or_job]
+
+    @classmethod
+    def add(
+        cls,
+        func: Callable,
+        interval: Number,
+        policy: SchedulePolicy = SchedulePolicy.FIRE_ONCE,
+        max_catch_up: int = DEFAULT_MAX_CATCH_UP,
+    ) -> ScheduledJob:
         """関数をスケジュールに追加する。
         Args:
             func (function): 定期的に呼び出す関数
             interval (int): 関数を呼び出す間隔(milliseconds)
+            policy (SchedulePolicy): 呼び出しが遅れたときの扱い
+            max_catch_up (int): CATCH_UPで1回のexecuteで呼び出す最大回数
+        Returns:
+            ScheduledJob: 登録したスケジュールのハンドル
         """
-        schedule = OrderedDict()
-        schedule["func"] = func
-        schedule["interval"] = interval
-        schedule["clock"] = Stopwatch()
-        cls._schedule_list.append(schedule)
+        return cls.backend.add(func, interval, policy, max_catch_up)
 
     @classmethod
     def execute(cls):
         """スケジュールに登録された関数を実行する"""
-        for schedule in cls._schedule_list:
-            if schedule["clock"].read() >= schedule["interval"]:
-                schedule["func"]()
-                schedule["clock"].reset()
+        cls.backend.execute()
 
     @classmethod
-    def get_mutable_schedule(cls, scheduled_func: Callable) -> \
-            Union[ItemOfScheduleList, None]:
+    def get_mutable_schedule(
+        cls, scheduled_func: Callable
+    ) -> Union[ScheduledJob, None]:
         """指定した関数オブジェクトが登録されているスケジュールを取得する"""
-        for schedule in cls._schedule_list:
-            if schedule["func"] == scheduled_func:
-                return schedule
-        return None
+        return cls.backend.jobs.get(scheduled_func)
 
     @classmethod
     def is_func_scheduled(cls, func: Callable):
-        for schedule in cls._schedule_list:
-            if schedule["func"] == func:
-                return True
-        return False
+        return func in cls.backend.jobs
 
     @classmethod
-    def activate_schedule(cls, scheduled_func: Callable):
+    def activate_schedule(cls, scheduled_func: Callable | ScheduledJob):
         """スケジュールに登録した関数のインターバルのタイマーを起動する。"""
-        schedule = cls.get_mutable_schedule(scheduled_func)
-        schedule["clock"].start()
+        cls.backend.activate(cls._job_of(scheduled_func))
 
     @classmethod
-    def deactivate_schedule(cls, scheduled_func):
+    def deactivate_schedule(cls, scheduled_func: Callable | ScheduledJob):
         """スケジュールに登録した関数のインターバルのタイマーを一時停止する。"""
-        print("deactivate")
-        schedule = cls.get_mutable_schedule(scheduled_func)
-        schedule["clock"].stop()
+        cls.backend.deactivate(cls._job_of(scheduled_func))
 
     @classmethod
-    def reset_interval_clock(cls, scheduled_func: Callable):
+    def reset_interval_clock(cls, scheduled_func: Callable | ScheduledJob):
         """スケジュールに登録した関数のインターバルのタイマーをリセットする。
         例えば、アニメーションの実装を考え、再生処理をこのクラスでインターバルを設定して
         スケジュールすることで再生速度のインターバルを実装するとします。
@@ -180,33 +656,29 @@ class Schedule:
         リセットしてからの次のフレームのインターバルが遅れるか早まり、ズレてしまいます。
         そのため、この関数でインターバルのタイマーをリセットするのを忘れないでください。
         """
-        schedule = cls.get_mutable_schedule(scheduled_func)
-        schedule["clock"].reset()
+        cls.backend.reset(cls._job_of(scheduled_func))
 
     @classmethod
-    def remove(cls, func: Callable):
+    def remove(cls, func: Callable | ScheduledJob):
         """スケジュールから関数を削除する"""
-        cls._schedule_list = [
-            schedule for schedule in cls._schedule_list
-            if schedule["func"] != func]
+        if isinstance(func, ScheduledJob) or func in cls.backend.jobs:
+            cls.backend.remove(cls._job_of(func))
 
     @classmethod
-    def change_interval(cls, scheduled_func: Callable, new_interval: Number):
-        schedule = cls.get_mutable_schedule(scheduled_func)
-        schedule["interval"] = new_interval
+    def change_interval(
+        cls, scheduled_func: Callable | ScheduledJob, new_interval: Number
+    ):
+        cls.backend.change_interval(cls._job_of(scheduled_func), new_interval)
 
     @classmethod
     def _debug(cls):
-        for schedule in cls._schedule_list:
-            print_end = " "
-            for key, value in zip(list(schedule), list(schedule.values())):
-                if isinstance(value, (Callable, Stopwatch)):
-                    if isinstance(value, Stopwatch):
-                        print_end = f" time: {schedule['clock'].read()}" + \
-                            f" pausing: {schedule['clock'].read_pausing()}"
-                    value = id(value)
-                print(key, value, end=print_end)
-            print(end="\n")
+        for job in cls.backend.jobs.values():
+            print(
+                "func", id(job.func),
+                "interval", job.interval,
+                "is active?", job.is_active,
+                "time left", job.time_left(),
+            )
 
 
 class ScheduleOld:
@@ -1,18 +1,298 @@
 from array import array
+from functools import cache
 from pathlib import Path
 from typing import Any
+import hashlib
 import os
 
 
 import moderngl
+import numpy as np
 import pygame
 
 from .designpattern import Singleton
 
-with open(Path(__file__).parent / "default.vert", "r") as f:
-    VERTEX_DEFAULT = f.read()
-with open(Path(__file__).parent / "default.frag", "r") as f:
-    FRAGMENT_DEFAULT = f.read()
+_DEFAULT_SOURCE_FILES = {
+    "VERTEX_DEFAULT": "default.vert",
+    "FRAGMENT_DEFAULT": "default.frag",
+}
+
+
+@cache
+def default_shader_source(name: str) -> str:
+    """Read `VERTEX_DEFAULT` or `FRAGMENT_DEFAULT` on first use."""
+    with open(Path(__file__).parent / _DEFAULT_SOURCE_FILES[name], "r") as f:
+        return f.read()
+
+
+def __getattr__(name: str) -> str:
+    # VERTEX_DEFAULT and FRAGMENT_DEFAULT are loaded lazily
+    if name in _DEFAULT_SOURCE_FILES:
+        return default_shader_source(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _insert_defines(source: str, defines: dict[str, Any]) -> str:
+    """Insert `#define`s after the `#version` line (which must come first)."""
+    if not defines:
+        return source
+    lines = "".join(f"#define {key} {value}\n" for key, value in defines.items())
+    if source.lstrip().startswith("#version"):
+        version, _, body = source.lstrip().partition("\n")
+        return f"{version}\n{lines}{body}"
+    return lines + source
+
+
+class ProgramCache:
+    """コンパイル済みのシェーダープログラムのキャッシュ。
+
+    ソースコードとdefinesのハッシュをキーにするので、同じエフェクトを
+    何度登録してもコンパイルは1回で済む。プログラムはキャッシュが所有し、
+    clearで解放される。
+
+    Attributes:
+        hits (int): キャッシュから返した回数。
+        misses (int): コンパイルした回数。
+    """
+
+    def __init__(self, ctx: moderngl.Context):
+        self.ctx = ctx
+        self._programs: dict[str, moderngl.Program] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._programs)
+
+    @staticmethod
+    def key_of(
+        vertex: str,
+        fragment: str | None = None,
+        defines: dict[str, Any] | None = None,
+        varyings: tuple[str, ...] = (),
+        owner: Any = None,
+    ) -> str:
+        digest = hashlib.sha256()
+        parts = (vertex, fragment or "", owner, *sorted((defines or {}).items()))
+        for part in parts:
+            digest.update(repr(part).encode())
+            digest.update(b"\0")
+        digest.update(repr(tuple(varyings)).encode())
+        return digest.hexdigest()
+
+    def get(
+        self,
+        vertex: str,
+        fragment: str | None = None,
+        defines: dict[str, Any] | None = None,
+        varyings: tuple[str, ...] = (),
+        owner: Any = None,
+    ) -> moderngl.Program:
+        """プログラムを返す。キャッシュにない場合だけコンパイルする。
+
+        uniformの値はプログラムごとの状態なので、同じプログラムを受け取った
+        呼び出し側どうしで共有される。SpriteBatchやGPUEmitterのように描画の
+        たびにすべてのuniformを設定する呼び出し側は、ownerなしで共有して
+        よい。そうでない呼び出し側 (一度設定したuniformを保持するShader2D
+        など) は、ownerに自分を表す値を渡して別のプログラムを受け取る。
+
+        Args:
+            owner (Any): プログラムを共有する範囲。同じソースでもownerが
+                違えば別のプログラムになる。reprがキーに使われる。
+        """
+        key = self.key_of(vertex, fragment, defines, varyings, owner)
+        if (program := self._programs.get(key)) is not None:
+            self.hits += 1
+            return program
+        self.misses += 1
+        defines = defines or {}
+        program = self.ctx.program(
+            vertex_shader=_insert_defines(vertex, defines),
+            fragment_shader=(
+                None if fragment is None else _insert_defines(fragment, defines)
+            ),
+            varyings=varyings,
+        )
+        self._programs[key] = program
+        return program
+
+    def discard(self, program: moderngl.Program):
+        """プログラムをキャッシュから取り除いて解放する。
+
+        ほかの呼び出し側と共有していないプログラムにだけ使う。
+        キャッシュにないプログラムは無視する。
+        """
+        for key, cached in self._programs.items():
+            if cached is program:
+                del self._programs[key]
+                program.release()
+                return
+
+    def clear(self):
+        for program in self._programs.values():
+            program.release()
+        self._programs.clear()
+
+
+SOFTWARE_RENDERERS = ("llvmpipe", "softpipe", "swrast", "software")
+
+
+def create_standalone_context(require: int = 330) -> moderngl.Context:
+    """ウィンドウなしのコンテキストを作る。EGLを先に試し、だめなら既定の
+    バックエンドを使う。どちらも使えなければ最後の例外を送出する。"""
+    try:
+        return moderngl.create_standalone_context(require=require, backend="egl")
+    except Exception:
+        return moderngl.create_standalone_context(require=require)
+
+
+def _is_software_renderer(ctx: moderngl.Context) -> bool:
+    renderer = str(ctx.info.get("GL_RENDERER", "")).lower()
+    return any(name in renderer for name in SOFTWARE_RENDERERS)
+
+
+class StreamingTexture:
+    """Surfaceの内容を毎フレーム転送するためのテクスチャ。
+
+    ピクセルはまずピクセルバッファ(PBO)のリングに書き込まれ、そこから
+    テクスチャへ転送される。書き込む前にバッファをorphanするので、
+    GPUが前のフレームの転送を終えるのを待たずに済む。
+    dirty_rectsを渡すと変更された矩形だけを転送し、Surfaceの大きさが
+    変わった場合はテクスチャを作り直す。
+
+    buffer_countを省略すると、ソフトウェアレンダラー(llvmpipeなど)では
+    PBOを使わず直接書き込む。PBOはコピーが1回増えるだけで速くならないため。
+
+    Attributes:
+        texture (moderngl.Texture): 転送先のテクスチャ。
+        bytes_last_write (int): 直前のwriteで転送したバイト数。
+        bytes_written (int): これまでに転送したバイト数の合計。
+    """
+
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        size: tuple[int, int],
+        buffer_count: int | None = None,
+    ):
+        self.ctx = ctx
+        self.texture = self._create_texture(size)
+        if buffer_count is None:
+            buffer_count = 0 if _is_software_renderer(ctx) else 3
+        self._buffers = [ctx.buffer(reserve=4) for _ in range(buffer_count)]
+        self._buffer_index = 0
+        self.bytes_last_write = 0
+        self.bytes_written = 0
+
+    def _create_texture(self, size: tuple[int, int]) -> moderngl.Texture:
+        texture = self.ctx.texture(size, 4)
+        texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        if os.name == "nt":
+            # Windows
+            texture.swizzle = "BGRA"
+        return texture
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.texture.size
+
+    def resize(self, size: tuple[int, int]):
+        if size != self.texture.size:
+            self.texture.release()
+            self.texture = self._create_texture(size)
+
+    def _upload(self, data, viewport: tuple[int, int, int, int] | None = None):
+        nbytes = memoryview(data).nbytes
+        self.bytes_last_write += nbytes
+        if not self._buffers:
+            self.texture.write(data, viewport=viewport, alignment=4)
+            return
+        buffer = self._buffers[self._buffer_index]
+        self._buffer_index = (self._buffer_index + 1) % len(self._buffers)
+        buffer.orphan(nbytes)
+        buffer.write(data)
+        self.texture.write(buffer, viewport=viewport, alignment=4)
+
+    def write(
+        self,
+        surface: pygame.surface.Surface,
+        dirty_rects: list[pygame.Rect] | None = None,
+    ):
+        """SurfaceのピクセルをテクスチャへPBO経由で転送する。
+
+        Args:
+            surface (pygame.surface.Surface): 32bitのSurface。
+            dirty_rects (list[pygame.Rect] | None): 変更された矩形。
+                Noneの場合はSurface全体を転送する。
+                テクスチャを作り直した場合は常に全体を転送する。
+        """
+        self.bytes_last_write = 0
+        if surface.get_size() != self.texture.size:
+            self.resize(surface.get_size())
+            dirty_rects = None
+        if dirty_rects is None:
+            self._upload(surface.get_view("1"))
+        else:
+            pixels = np.asarray(surface.get_view("2"))  # indexed by [x, y]
+            bounds = surface.get_rect()
+            for rect in dirty_rects:
+                rect = bounds.clip(rect)
+                if rect.width == 0 or rect.height == 0:
+                    continue
+                region = pixels[rect.left : rect.right, rect.top : rect.bottom]
+                self._upload(np.ascontiguousarray(region.T), tuple(rect))
+        self.bytes_written += self.bytes_last_write
+
+    def release(self):
+        self.texture.release()
+        for buffer in self._buffers:
+            buffer.release()
+
+
+class RenderTargetPool:
+    """ポストプロセスで使うレンダーターゲット(テクスチャ付きフレームバッファ)のプール。
+
+    同じ大きさのターゲットは解放後に再利用されるので、毎フレームGPUの
+    メモリを確保し直さずに済む。
+
+    Attributes:
+        created_count (int): これまでに作成したターゲットの数。
+    """
+
+    def __init__(self, ctx: moderngl.Context):
+        self.ctx = ctx
+        self._free: dict[tuple[int, int], list[moderngl.Framebuffer]] = {}
+        self._all: list[moderngl.Framebuffer] = []
+        self.created_count = 0
+
+    def acquire(self, size: tuple[int, int]) -> moderngl.Framebuffer:
+        if free := self._free.get(size):
+            return free.pop()
+        texture = self.ctx.texture(size, 4)
+        texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        framebuffer = self.ctx.framebuffer(color_attachments=[texture])
+        self._all.append(framebuffer)
+        self.created_count += 1
+        return framebuffer
+
+    def release(self, framebuffer: moderngl.Framebuffer):
+        self._free.setdefault(framebuffer.size, []).append(framebuffer)
+
+    def trim(self, keep_size: tuple[int, int] | None = None):
+        """Release the GPU memory of free targets of other sizes than keep_size."""
+        for size in list(self._free):
+            if size != keep_size:
+                for framebuffer in self._free.pop(size):
+                    self._all.remove(framebuffer)
+                    framebuffer.color_attachments[0].release()
+                    framebuffer.release()
+
+    def clear(self):
+        for framebuffer in self._all:
+            framebuffer.color_attachments[0].release()
+            framebuffer.release()
+        self._all.clear()
+        self._free.clear()
 
 
 class Shader2D(metaclass=Singleton):
@@ -24,13 +304,33 @@ class Shader2D(metaclass=Singleton):
         programs (dict): シェーダープログラムオブジェクトを格納する辞書。
         vaos (dict): 頂点配列オブジェクトを格納する辞書。
         buffer (moderngl.Buffer): 頂点バッファオブジェクト。
+        streams (dict): Surfaceから転送するテクスチャ(StreamingTexture)の辞書。
+        bytes_uploaded_last_frame (int): 前のフレームで転送したバイト数。
+        post_processes (dict): ポストプロセスのプログラム名と有効かどうか。
+            登録した順に適用される。
+        render_targets (RenderTargetPool): ポストプロセス用のターゲットのプール。
+        program_cache (ProgramCache): コンパイル済みプログラムのキャッシュ。
     """
 
-    def __init__(self):
-        self.ctx = moderngl.create_context()
+    def __init__(self, ctx: moderngl.Context = None):
+        """
+        Args:
+            ctx (moderngl.Context): 使用するコンテキスト。省略した場合は
+                pygameのウィンドウのコンテキストを使う。
+                ウィンドウなしで動かす場合はstandaloneのコンテキストを渡す。
+        """
+        if ctx is None:
+            ctx = moderngl.create_context()
+        self.ctx = ctx
         self.textures: dict[Any, moderngl.Texture] = {}
         self.programs: dict[Any, moderngl.Program] = {}
         self.vaos: dict[Any, moderngl.VertexArray] = {}
+        self.streams: dict[Any, StreamingTexture] = {}
+        self._bytes_uploaded = 0
+        self.bytes_uploaded_last_frame = 0
+        self.post_processes: dict[Any, bool] = {}
+        self.render_targets = RenderTargetPool(self.ctx)
+        self.program_cache = ProgramCache(self.ctx)
         self.buffer: dict[Any, moderngl.Buffer] = self.ctx.buffer(
             data=array(
                 "f",
@@ -56,56 +356,132 @@ class Shader2D(metaclass=Singleton):
             )
         )
 
+        # same quad for rendered textures, whose first row is the bottom
+        self._post_process_buffer = self.ctx.buffer(
+            data=array(
+                "f",
+                [
+                    # x, y, u ,v
+                    -1.0,
+                    1.0,
+                    0.0,
+                    1.0,  # top left
+                    1.0,
+                    1.0,
+                    1.0,
+                    1.0,  # top right
+                    -1.0,
+                    -1.0,
+                    0.0,
+                    0.0,  # bottom left
+                    1.0,
+                    -1.0,
+                    1.0,
+                    0.0,  # bottom right
+                ],
+            )
+        )
+
         self.compile_and_register_program(
-            vertex=VERTEX_DEFAULT,
-            fragment=FRAGMENT_DEFAULT,
+            vertex=default_shader_source("VERTEX_DEFAULT"),
+            fragment=default_shader_source("FRAGMENT_DEFAULT"),
             program_name="display_surface",
         )
 
-    def compile_and_register_program(self, vertex, fragment, program_name):
+    def _register_program(self, program_name, program, buffer):
+        if (old_vao := self.vaos.get(program_name)) is not None:
+            old_vao.release()
+        old_program = self.programs.get(program_name)
+        if old_program is not None and old_program is not program:
+            # the owner keeps other names from sharing the replaced program
+            self.program_cache.discard(old_program)
+        self.programs[program_name] = program
+        # skip_errors: a program may not use in_texcoord
+        self.vaos[program_name] = self.ctx.vertex_array(
+            program, [(buffer, "2f 2f", "in_vert", "in_texcoord")], skip_errors=True
+        )
+
+    def compile_and_register_program(
+        self, vertex, fragment, program_name, defines=None
+    ):
         """
 
         Args:
             vertex (str): 頂点シェーダーのソースコード。
             fragment (str): フラグメントシェーダーのソースコード。
             program_name (str): シェーダープログラムの名前。
+            defines (dict): #versionの後に挿入する#defineの名前と値。
+
+        Notes:
+            同じ名前で同じソースコードとdefinesのプログラムはprogram_cacheから
+            再利用されるので、再登録してもコンパイルし直さない。
+            名前ごとにuniformを持てるよう、別の名前とは共有しない。
+            違うソースコードやdefinesで再登録すると、前のプログラムは
+            program_cacheから取り除かれて解放される。
         """
-        vert_raw = vertex
-        frag_raw = fragment
-        program = self.ctx.program(vertex_shader=vert_raw, fragment_shader=frag_raw)
-        self.programs[program_name] = program
-        self.vaos[program_name] = self.ctx.vertex_array(
-            program, [(self.buffer, "2f 2f", "in_vert", "in_texcoord")]
+        program = self.program_cache.get(
+            vertex, fragment, defines, owner=("Shader2D", program_name)
         )
+        self._register_program(program_name, program, self.buffer)
 
-    def _surface_to_texture(self, surface: pygame.surface.Surface):
-        texture = self.ctx.texture(surface.get_size(), 4)
-        texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
-        if os.name == "nt":
-            # Windows
-            texture.swizzle = "BGRA"
-        return texture
+    def add_post_process(
+        self, fragment, program_name, enabled=True, vertex=None, defines=None
+    ):
+        """画面全体にかけるポストプロセスを最後に追加する。
+
+        Args:
+            fragment (str): フラグメントシェーダーのソースコード。
+                直前の結果はユニット0のsampler2Dで受け取る。
+                vec2のuniform `resolution`があれば出力の大きさが設定される。
+            program_name (str): シェーダープログラムの名前。
+            enabled (bool): 有効にするかどうか。
+            vertex (str): 頂点シェーダーのソースコード。省略時は標準のもの。
+            defines (dict): #versionの後に挿入する#defineの名前と値。
+        """
+        if vertex is None:
+            vertex = default_shader_source("VERTEX_DEFAULT")
+        program = self.program_cache.get(
+            vertex, fragment, defines, owner=("Shader2D", program_name)
+        )
+        self._register_program(program_name, program, self._post_process_buffer)
+        self.post_processes[program_name] = enabled
+
+    def set_post_process_enabled(self, program_name, enabled: bool):
+        """ポストプロセスを有効・無効にする。無効なものは描画されない。"""
+        self.post_processes[program_name] = enabled
+
+    def remove_post_process(self, program_name):
+        del self.post_processes[program_name]
+        self.vaos.pop(program_name).release()
+        self.program_cache.discard(self.programs.pop(program_name))
 
     def register_surface_as_texture(
-        self, surface: pygame.surface.Surface, texture_name
+        self,
+        surface: pygame.surface.Surface,
+        texture_name,
+        dirty_rects: list[pygame.Rect] | None = None,
     ):
         """PygameのSurfaceオブジェクトをテクスチャとして登録する。
 
         Args:
             surface (pygame.surface.Surface): PygameのSurfaceオブジェクト。
             texture_name (str): テクスチャの名前。
+            dirty_rects (list[pygame.Rect] | None): 前回から変更された矩形。
+                渡した場合はその部分だけを転送する。
 
         Notes:
             テクスチャが辞書に登録されていない場合は、
-            PygameのSurfaceオブジェクトからテクスチャオブジェクトを作成し、
+            PygameのSurfaceオブジェクトからStreamingTextureを作成し、
             辞書に登録する。
             テクスチャオブジェクトにSurfaceオブジェクトのデータを書き込む。
+            Surfaceの大きさが変わった場合はテクスチャを作り直す。
         """
-        if texture_name not in self.textures:
-            texture = self._surface_to_texture(surface)
-            self.textures[texture_name] = texture
-        buffer = surface.get_view("1")
-        self.textures[texture_name].write(buffer)
+        if (stream := self.streams.get(texture_name)) is None:
+            stream = StreamingTexture(self.ctx, surface.get_size())
+            self.streams[texture_name] = stream
+        stream.write(surface, dirty_rects)
+        self.textures[texture_name] = stream.texture
+        self._bytes_uploaded += stream.bytes_last_write
 
     def use_texture(self, texture_name, id):
         """texture_nameでtextures辞書に登録されたテクスチャを指定し、使用を切り替えます。
@@ -128,5 +504,44 @@ class Shader2D(metaclass=Singleton):
         self.programs[program_name][uniform].value = value
 
     def render(self):
-        for program_name in self.programs:
+        """登録されたプログラムを描画し、1フレームを締める。
+
+        有効なポストプロセスがあれば、描画結果をプールのターゲットに書き、
+        ポストプロセスを順に適用して最後のものを現在のフレームバッファに書く。
+
+        Notes:
+            前回のrenderからregister_surface_as_textureで転送したバイト数を
+            bytes_uploaded_last_frameに記録する。
+        """
+        self.bytes_uploaded_last_frame = self._bytes_uploaded
+        self._bytes_uploaded = 0
+        passes = [name for name, enabled in self.post_processes.items() if enabled]
+        output = self.ctx.fbo
+        if not passes:
+            self._render_scene()
+            return
+        # ping-pong: the scene and every pass but the last render to a target
+        # from the pool, whose texture is the input of the next pass
+        size = output.size
+        source = self.render_targets.acquire(size)
+        source.use()
+        self._render_scene()
+        for i, program_name in enumerate(passes):
+            if i == len(passes) - 1:
+                target = output
+            else:
+                target = self.render_targets.acquire(size)
+            target.use()
+            source.color_attachments[0].use(0)
+            program = self.programs[program_name]
+            if "resolution" in program:
+                program["resolution"].value = size
             self.vaos[program_name].render(mode=moderngl.TRIANGLE_STRIP)
+            self.render_targets.release(source)
+            source = target
+        self.render_targets.trim(keep_size=size)
+
+    def _render_scene(self):
+        for program_name in self.programs:
+            if program_name not in self.post_processes:
+                self.vaos[program_name].render(mode=moderngl.TRIANGLE_STRIP)
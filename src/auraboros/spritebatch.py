@@ -0,0 +1,279 @@
+from dataclasses import dataclass
+from typing import Any
+
+import moderngl
+import numpy as np
+import pygame
+
+from .shader import ProgramCache
+
+SPRITE_VERTEX = """
+#version 330 core
+
+uniform vec2 viewport;
+
+in vec2 in_corner;
+in vec2 in_pos;
+in vec2 in_size;
+in float in_rotation;
+in vec4 in_uv;
+in vec4 in_tint;
+
+out vec2 uv;
+out vec4 tint;
+
+void main() {
+    vec2 offset = (in_corner - 0.5) * in_size;
+    float c = cos(in_rotation);
+    float s = sin(in_rotation);
+    vec2 pos = in_pos + vec2(c * offset.x - s * offset.y, s * offset.x + c * offset.y);
+    gl_Position = vec4(
+        pos.x / viewport.x * 2.0 - 1.0, 1.0 - pos.y / viewport.y * 2.0, 0.0, 1.0
+    );
+    uv = mix(in_uv.xy, in_uv.zw, in_corner);
+    tint = in_tint;
+}
+"""
+
+SPRITE_FRAGMENT = """
+#version 330 core
+
+uniform sampler2D atlas;
+
+in vec2 uv;
+in vec4 tint;
+out vec4 color;
+
+void main() {
+    color = texture(atlas, uv) * tint;
+    if (color.a == 0.0) {
+        discard;  // fully transparent pixels need no blending
+    }
+}
+"""
+
+_INSTANCE_LAYOUT = "2f 2f 1f 4f 4f /i"
+_INSTANCE_ATTRIBUTES = ("in_pos", "in_size", "in_rotation", "in_uv", "in_tint")
+_INSTANCE_FLOATS = 13
+
+
+@dataclass(frozen=True)
+class AtlasRegion:
+    """
+    Where an image is in a TextureAtlas.
+
+    Attributes:
+        rect: (x, y, width, height) in pixels of the atlas.
+        uv: (u0, v0, u1, v1), the top-left and bottom-right texture coordinates.
+    """
+
+    rect: tuple[int, int, int, int]
+    uv: tuple[float, float, float, float]
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.rect[2:]
+
+
+class TextureAtlas:
+    """
+    One texture holding many images, packed in rows (shelves) from the
+    top-left, so sprites of different images can be drawn in one call.
+
+    Examples:
+        atlas = TextureAtlas(shader2d.ctx)
+        player = atlas.add("player", pygame.image.load("player.png"))
+    """
+
+    def __init__(
+        self, ctx: moderngl.Context, size: tuple[int, int] = (1024, 1024), padding=1
+    ):
+        self.ctx = ctx
+        self.size = size
+        self.padding = padding
+        self.texture = ctx.texture(size, 4)
+        self.texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        self.regions: dict[Any, AtlasRegion] = {}
+        self._cursor = [0, 0]
+        self._shelf_height = 0
+
+    def __getitem__(self, key) -> AtlasRegion:
+        return self.regions[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.regions
+
+    def _allocate(self, width: int, height: int) -> tuple[int, int]:
+        x, y = self._cursor
+        if x + width > self.size[0]:
+            x, y = 0, y + self._shelf_height + self.padding
+            self._shelf_height = 0
+        if x + width > self.size[0] or y + height > self.size[1]:
+            raise ValueError(f"The atlas has no room for an image of {width}x{height}.")
+        self._cursor = [x + width + self.padding, y]
+        self._shelf_height = max(self._shelf_height, height)
+        return x, y
+
+    def add(self, key, surface: pygame.surface.Surface) -> AtlasRegion:
+        """Copy the surface into the atlas. Adding an existing key replaces it
+        only if the size is the same; otherwise a new area is used."""
+        width, height = surface.get_size()
+        if (old := self.regions.get(key)) is not None and old.size == (width, height):
+            x, y = old.rect[:2]
+        else:
+            x, y = self._allocate(width, height)
+        self.texture.write(
+            pygame.image.tobytes(surface, "RGBA"), viewport=(x, y, width, height)
+        )
+        atlas_width, atlas_height = self.size
+        region = AtlasRegion(
+            (x, y, width, height),
+            (
+                x / atlas_width,
+                y / atlas_height,
+                (x + width) / atlas_width,
+                (y + height) / atlas_height,
+            ),
+        )
+        self.regions[key] = region
+        return region
+
+    def release(self):
+        self.texture.release()
+
+
+class SpriteBatch:
+    """
+    Draws many sprites of a TextureAtlas with one instanced draw call.
+
+    Sprites are queued into NumPy arrays with `draw` or `draw_many` during
+    the frame; `flush` writes them to an instance buffer and renders them
+    all at once, then empties the queue. Positions are the centers of
+    the sprites in pixels of `viewport` (top-left origin, like pygame),
+    rotations are in radians and tints are RGBA multipliers in 0-1.
+
+    Fully transparent pixels are discarded, but blending is left to the
+    caller, whose GL state `flush` does not change: enable moderngl.BLEND
+    with SRC_ALPHA, ONE_MINUS_SRC_ALPHA for translucent sprites.
+
+    Examples:
+        batch = SpriteBatch(shader2d.ctx, atlas, program_cache=shader2d.program_cache)
+        ...
+        shader2d.render()
+        batch.draw_many(atlas["bullet"], bullet_positions)
+        shader2d.ctx.enable(moderngl.BLEND)
+        shader2d.ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+        batch.flush(pygame.display.get_window_size())
+        pygame.display.flip()
+
+    Attributes:
+        sprite_count: number of queued sprites.
+        draw_calls: number of draw calls of the last flush (0 or 1).
+    """
+
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        atlas: TextureAtlas,
+        capacity=1024,
+        program_cache: ProgramCache | None = None,
+    ):
+        self.ctx = ctx
+        self.atlas = atlas
+        self._owns_program_cache = program_cache is None
+        if program_cache is None:
+            program_cache = ProgramCache(ctx)
+        self.program_cache = program_cache
+        self.program = program_cache.get(SPRITE_VERTEX, SPRITE_FRAGMENT)
+        self._corners = ctx.buffer(
+            np.array([0, 0, 1, 0, 0, 1, 1, 1], dtype="f4").tobytes()
+        )
+        self._instances = np.zeros((capacity, _INSTANCE_FLOATS), dtype="f4")
+        self._instance_buffer = ctx.buffer(reserve=self._instances.nbytes)
+        self._vao = ctx.vertex_array(
+            self.program,
+            [
+                (self._corners, "2f", "in_corner"),
+                (self._instance_buffer, _INSTANCE_LAYOUT, *_INSTANCE_ATTRIBUTES),
+            ],
+        )
+        self.sprite_count = 0
+        self.draw_calls = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._instances)
+
+    def _reserve(self, count: int) -> np.ndarray:
+        needed = self.sprite_count + count
+        if needed > self.capacity:
+            grown = np.zeros((max(needed, self.capacity * 2), _INSTANCE_FLOATS), "f4")
+            grown[: self.sprite_count] = self._instances[: self.sprite_count]
+            self._instances = grown
+        rows = self._instances[self.sprite_count : needed]
+        self.sprite_count = needed
+        return rows
+
+    def draw(
+        self,
+        region: AtlasRegion,
+        pos: tuple[float, float],
+        scale: float = 1.0,
+        rotation: float = 0.0,
+        tint: tuple[float, float, float, float] = (1.0, 1.0, 1.0, 1.0),
+    ):
+        row = self._reserve(1)[0]
+        width, height = region.size
+        row[:2] = pos
+        row[2:4] = (width * scale, height * scale)
+        row[4] = rotation
+        row[5:9] = region.uv
+        row[9:13] = tint
+
+    def draw_many(
+        self,
+        region: AtlasRegion,
+        positions: np.ndarray,
+        scales: np.ndarray | float = 1.0,
+        rotations: np.ndarray | float = 0.0,
+        tints: np.ndarray | tuple = (1.0, 1.0, 1.0, 1.0),
+    ):
+        """Queue one sprite per row of `positions` (shape (n, 2)).
+        The other arguments are per-sprite arrays or one value for all."""
+        positions = np.asarray(positions)
+        rows = self._reserve(len(positions))
+        rows[:, 0:2] = positions
+        rows[:, 2:4] = np.multiply.outer(
+            np.broadcast_to(scales, len(positions)), region.size
+        )
+        rows[:, 4] = rotations
+        rows[:, 5:9] = region.uv
+        rows[:, 9:13] = tints
+
+    def clear(self):
+        self.sprite_count = 0
+
+    def flush(self, viewport: tuple[int, int]):
+        """Render the queued sprites to the current framebuffer and clear."""
+        self.draw_calls = 0
+        if self.sprite_count == 0:
+            return
+        data = self._instances[: self.sprite_count]
+        if data.nbytes > self._instance_buffer.size:
+            self._instance_buffer.orphan(self._instances.nbytes)
+        else:
+            self._instance_buffer.orphan()
+        self._instance_buffer.write(data)
+        self.program["viewport"].value = tuple(viewport)
+        self.atlas.texture.use(0)
+        self.program["atlas"].value = 0
+        self._vao.render(moderngl.TRIANGLE_STRIP, instances=self.sprite_count)
+        self.draw_calls = 1
+        self.sprite_count = 0
+
+    def release(self):
+        self._vao.release()
+        self._instance_buffer.release()
+        self._corners.release()
+        if self._owns_program_cache:
+            self.program_cache.clear()
@@ -9,7 +9,7 @@ import pygame
 
 from .gameinput import Keyboard, Mouse
 from .gametext import GameText
-from .utils.coordinate import in_scaled_px
+from .utils.coordinate import mouse_pos_in_scaled_px
 
 # --setup logger--
 logger = logging.getLogger(__name__)
@@ -95,7 +95,7 @@ class UI:
 
     def event(self, event: pygame.event.Event):
         if self.on_hover:
-            if self.is_givenpos_over_ui(in_scaled_px(pygame.mouse.get_pos())):
+            if self.is_givenpos_over_ui(mouse_pos_in_scaled_px()):
                 self.on_hover()
 
     def update(self, dt):
@@ -1,3 +1,5 @@
+import pygame
+
 from ..core import Global
 
 
@@ -18,6 +20,14 @@ def in_scaled_px(coordinate) -> tuple[int, int]:
     return tuple(map(lambda num: num // Global.base_px_scale, coordinate))
 
 
+def mouse_pos_in_scaled_px() -> tuple[int, int]:
+    """Get the mouse position on Global.screen."""
+    if Global.is_display_scaled_by_sdl:
+        # SDL already reports it in the logical (scaled) size
+        return pygame.mouse.get_pos()
+    return in_scaled_px(pygame.mouse.get_pos())
+
+
 def calc_x_to_center(width_of_stuff_to_be_centered: int) -> int:
     return window_size_in_scaled_px()[0] // 2 - width_of_stuff_to_be_centered // 2
 
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from src.auraboros.shader import create_standalone_context
+
+VIEWPORT = (64, 32)
+
+
+@pytest.fixture
+def gl_ctx():
+    """A standalone OpenGL context with a cleared VIEWPORT framebuffer bound.
+    Tests using it are skipped where no context can be created."""
+    try:
+        ctx = create_standalone_context()
+    except Exception as error:
+        pytest.skip(f"no standalone OpenGL context: {error}")
+    framebuffer = ctx.simple_framebuffer(VIEWPORT)
+    framebuffer.use()
+    framebuffer.clear()
+    yield ctx
+    ctx.release()
+
+
+def read_pixels(ctx) -> np.ndarray:
+    """RGBA pixels of the bound framebuffer as [y, x], y from the top."""
+    data = ctx.fbo.read(components=4)
+    pixels = np.frombuffer(data, np.uint8).reshape(VIEWPORT[1], VIEWPORT[0], 4)
+    return pixels[::-1]
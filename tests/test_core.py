@@ -0,0 +1,67 @@
+import os
+
+import pygame
+
+from src.auraboros import core
+from src.auraboros.core import Global, scale_px_of_pygame_get_surface_display
+
+
+def _present_red_pixel() -> pygame.Surface:
+    scale_px_of_pygame_get_surface_display()
+    Global.screen.fill((0, 0, 0))
+    Global.screen.set_at((1, 1), (255, 0, 0))
+    scale_px_of_pygame_get_surface_display()
+    return pygame.display.get_surface()
+
+
+class TestPresent:
+    @staticmethod
+    def test_software_scale():
+        core.init(window_size=(64, 48), base_pixel_scale=4, headless=True)
+        display = _present_red_pixel()
+        assert Global.screen.get_size() == (16, 12)
+        assert display.get_at((4, 4)) == display.get_at((7, 7)) == (255, 0, 0)
+        assert display.get_at((8, 8)) == (0, 0, 0)
+
+    @staticmethod
+    def test_unscaled_display_is_blitted():
+        core.init(window_size=(64, 48), headless=True)
+        display = _present_red_pixel()
+        assert Global.screen is not display
+        assert display.get_at((1, 1)) == (255, 0, 0)
+        assert display.get_at((2, 2)) == (0, 0, 0)
+
+    @staticmethod
+    def test_sdl_scaling_falls_back_without_a_renderer():
+        # the dummy video driver of headless mode cannot create a renderer
+        core.init(
+            window_size=(64, 48),
+            base_pixel_scale=4,
+            headless=True,
+            scale_display_by_sdl=True,
+        )
+        assert not Global.is_display_scaled_by_sdl
+        display = _present_red_pixel()
+        assert display.get_size() == (64, 48)
+        assert display.get_at((4, 4)) == (255, 0, 0)
+
+    @staticmethod
+    def test_opengl_display_is_not_scaled_on_the_cpu():
+        core.init(window_size=(64, 48), base_pixel_scale=4, headless=True)
+        Global.use_opengl_display = True
+        try:
+            display = _present_red_pixel()
+        finally:
+            Global.use_opengl_display = False
+        assert Global.screen.get_size() == (16, 12)
+        assert display.get_at((4, 4)) == (0, 0, 0)
+
+
+def test_init_restores_the_video_driver_after_headless(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "offscreen")
+    core.init(window_size=(64, 48), headless=True)
+    assert pygame.display.get_driver() == "dummy"
+    core.init(window_size=(64, 48))
+    assert not Global.is_headless
+    assert os.environ["SDL_VIDEODRIVER"] == "offscreen"
+    assert pygame.display.get_driver() == "offscreen"
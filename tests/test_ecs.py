@@ -1,4 +1,14 @@
-from src.auraboros.ecs.world import World, System, component
+import numpy as np
+import pygame
+
+from src.auraboros.ecs.snapshot import load_world, save_world
+from src.auraboros.ecs.world import (
+    World,
+    System,
+    Vector,
+    columnar_component,
+    component,
+)
 
 
 def test_integration():
@@ -56,3 +66,472 @@ def test_integration():
 
     world.remove_component_of(Ikuyo, Velocity)
     assert not world.has_component(Ikuyo, Velocity)
+
+
+def test_archetype_storage():
+    @component
+    class Position:
+        x: int
+        y: int
+
+    @component
+    class Velocity:
+        x: int
+        y: int
+
+    world = World()
+    a = world.create_entity(Position(0, 0), Velocity(1, 1))
+    b = world.create_entity(Position(5, 5), Velocity(2, 2))
+    c = world.create_entity(Position(9, 9))
+
+    archetypes = list(world.get_archetypes(Position, Velocity))
+    assert len(archetypes) == 1
+    assert archetypes[0].entities == [a, b]
+    assert len(list(world.get_archetypes(Position))) == 2
+
+    for archetype in world.get_archetypes(Position, Velocity):
+        for pos, vel in zip(archetype.column(Position), archetype.column(Velocity)):
+            pos.x += vel.x
+    assert world.component_for_entity(b, Position).x == 7
+
+    # swap-removal keeps the remaining rows reachable
+    world.delete_entity(a)
+    assert world.component_for_entity(b, Velocity).x == 2
+
+    world.remove_component_of(b, Velocity)
+    assert not world.has_component(b, Velocity)
+    assert world.component_for_entity(b, Position).x == 7
+    assert sorted(world.get_entities(Position)) == [b, c]
+    assert not world.is_exist(Velocity)
+
+
+def test_query():
+    @component
+    class Position:
+        x: int
+
+    @component
+    class Velocity:
+        x: int
+
+    @component
+    class Weight:
+        kg: float
+
+    world = World()
+    a = world.create_entity(Position(0), Velocity(1))
+    b = world.create_entity(Position(0))
+    query = world.query(Position, Velocity)
+    assert world.query(Position, Velocity) is query
+    assert list(query.entities()) == [a]
+
+    # archetypes created after registration are picked up
+    c = world.create_entity(Velocity(3), Weight(2.0), Position(10))
+    for entity, (pos, vel) in query:
+        pos.x += vel.x
+    assert world.edit(c, Position).x == 13
+    assert len(query) == 2
+
+    world.remove_component_of(a, Velocity)
+    world.delete_entity(c)
+    assert len(query) == 0
+
+    any_query = world.query(any_of=(Velocity, Weight))
+    d = world.create_entity(Weight(1.0))
+    assert list(any_query) == [(d, (None, world.edit(d, Weight)))]
+    assert sorted(world.get_entities(Position, Weight)) == [a, b, d]
+
+
+def test_structural_changes_while_iterating_queries():
+    @component
+    class A:
+        value: int
+
+    @component
+    class B:
+        pass
+
+    world = World()
+    entities = [world.create_entity(A(i)) for i in range(10)]
+    for entity in world.get_entities(A):
+        world.delete_entity(entity)
+    assert not any(world.is_exist(entity) for entity in entities)
+
+    entities = [world.create_entity(A(i)) for i in range(10)]
+    seen = []
+    for entity, (a,) in world.query(A):
+        seen.append(a.value)
+        world.add_component_to(entity, B())  # moves to a matching archetype
+        if a.value == 3:
+            world.delete_entity(entities[4])
+    assert seen == [0, 1, 2, 3, 5, 6, 7, 8, 9]
+    assert len(world.query(A, B)) == 9
+
+
+def test_columnar_component():
+    @columnar_component
+    class Position:
+        x: float = 0.0
+        y: float = 0.0
+
+    @columnar_component
+    class Velocity:
+        x: float
+        y: float
+
+    @columnar_component
+    class Color:
+        rgb: Vector(int, 3)
+
+    world = World()
+    entities = [
+        world.create_entity(Position(i, 0), Velocity(1.0, 2.0)) for i in range(100)
+    ]
+    painted = world.create_entity(Position(), Color(np.array([255, 0, 0])))
+
+    for pos, vel in world.query(Position, Velocity).chunks():
+        assert isinstance(pos.x, np.ndarray)
+        pos.x += vel.x * 0.5
+        pos.y += vel.y * 0.5
+
+    proxy = world.edit(entities[10], Position)
+    assert isinstance(proxy, Position)
+    assert proxy.x == 10.5 and proxy.y == 1.0
+    proxy.y = 7.0
+    assert world.edit(entities[10], Position).y == 7.0
+    assert list(world.edit(painted, Color).rgb) == [255, 0, 0]
+
+    # rows moved by swap-removal are still reachable through the proxy
+    world.delete_entity(entities[0])
+    assert proxy.y == 7.0
+    world.remove_component_of(entities[10], Velocity)
+    assert world.edit(entities[10], Position).y == 7.0
+    assert len(world.query(Position, Velocity)) == 98
+
+    # proxies follow the entity to its new archetype
+    assert proxy.y == 7.0
+    world.add_component_to(entities[10], Velocity(0.0, 0.0))
+    proxy.x = 3.0
+    assert world.edit(entities[10], Position).x == 3.0
+    world.remove_component_of(entities[10], Velocity)
+    assert (proxy.x, proxy.y) == (3.0, 7.0)
+
+
+def test_columnar_proxies_behave_like_components():
+    @columnar_component
+    class P:
+        x: float = 0.0
+
+    @columnar_component
+    class Path:
+        points: Vector(float, 2)
+
+    world = World()
+    a = world.create_entity(P(1.0), Path(np.array([1.0, 2.0])))
+    proxy = world.edit(a, P)
+    assert proxy == P(1.0) and P(1.0) == proxy
+    assert proxy != P(2.0)
+    assert repr(proxy) == repr(P(1.0))
+    assert type(proxy.x) is float
+    assert world.edit(a, Path) == Path(np.array([1.0, 2.0]))
+
+    # a proxy passed back in is copied into a plain component
+    b = world.create_entity(world.edit(a, P))
+    c = world.create_entity()
+    world.add_component_to(c, world.edit(a, P))
+    world.commands.spawn(world.edit(a, P), world.edit(a, Path))
+    world.commands.apply()
+    assert world.has_component(b, P) and world.has_component(c, P)
+    assert len(world.query(P)) == 4
+    proxy.x = 5.0
+    assert world.edit(b, P).x == world.edit(c, P).x == 1.0
+    assert all(P.__columnar_proxy__ not in signature for signature in world._archetypes)
+
+
+def test_command_buffer():
+    @component
+    class Life:
+        value: int
+
+    @columnar_component
+    class Position:
+        x: float
+
+    @component
+    class Dead:
+        pass
+
+    class Reaper(System):
+        def do(self):
+            for entity, (life,) in self.world.query(Life):
+                life.value -= 1
+                if life.value <= 0:
+                    self.world.commands.despawn(entity)
+                    self.world.commands.despawn(entity)
+                    ghost = self.world.commands.spawn(Position(0.0))
+                    self.world.commands.add_component(ghost, Dead())
+
+    world = World()
+    entities = [world.create_entity(Life(i % 3), Position(i)) for i in range(30)]
+    world.add_system(Reaper())
+    world.do_systems()
+
+    assert len(world.commands) == 0
+    assert len(world.query(Life)) == 10
+    assert len(world.query(Position, Dead)) == 20
+    assert all(
+        world.edit(entity, Position).x == i
+        for i, entity in enumerate(entities)
+        if world.is_exist(entity)
+    )
+
+    world.delete_entities(entities)
+    assert len(world.query(Life)) == 0
+
+
+def test_command_buffer_skips_commands_of_despawned_entities():
+    @component
+    class Tag:
+        pass
+
+    world = World()
+    e, f = world.create_entity(Tag()), world.create_entity(Tag())
+    world.commands.despawn(e)
+    world.commands.add_component(e, Tag())
+    world.commands.remove_component(e, Tag)
+    world.commands.remove_component(f, Tag)
+    world.commands.remove_component(f, Tag)
+    world.commands.despawn(f)
+    world.do_systems()
+    assert not world.is_exist(e) and not world.is_exist(f)
+
+
+def test_command_buffer_clear_releases_spawned_ids():
+    world = World()
+    world.commands.spawn()
+    world.commands.spawn()
+    world.commands.clear()
+    world.commands.apply()
+    assert sorted(world._free_indices) == [0, 1]
+    world.create_entity()
+    world.create_entity()
+    assert world.next_entity_id == 2
+
+
+def test_world_stats():
+    @component
+    class Position:
+        x: int
+
+    class Idle(System):
+        def do(self):
+            for _ in self.world.query(Position):
+                pass
+
+    world = World()
+    entities = [world.create_entity(Position(i)) for i in range(5)]
+    world.delete_entity(entities[0])
+    world.delete_entities(entities[1:3])
+    world.add_system(Idle())
+    world.do_systems()
+
+    assert world.stats.spawns == 5
+    assert world.stats.despawns == 3
+    assert world.stats.query_hits == 2
+    assert world.stats.frames == 1
+    assert "Idle" in world.stats.system_time
+    assert "Archetype(Position; 2 entities)" in world.debug_dump()
+
+
+def test_system_scheduler_stages():
+    @columnar_component
+    class Position:
+        x: float
+
+    @columnar_component
+    class Velocity:
+        x: float
+
+    @component
+    class Health:
+        value: int
+
+    class Move(System):
+        reads = (Velocity,)
+        writes = (Position,)
+
+        def do(self):
+            for pos, vel in self.world.query(Position, Velocity).chunks():
+                pos.x += vel.x
+
+    class Regenerate(System):
+        writes = (Health,)
+
+        def do(self):
+            for _, (health,) in self.world.query(Health):
+                health.value += 1
+
+    class Render(System):
+        reads = (Position,)
+        order = 10
+
+        def do(self):
+            self.seen = [pos.x.sum() for (pos,) in self.world.query(Position).chunks()]
+
+    class Legacy(System):
+        def do(self):
+            pass
+
+    world = World()
+    world.scheduler.max_workers = 4
+    render = Render()
+    for system in (render, Legacy(), Move(), Regenerate()):
+        world.add_system(system)
+    entity = world.create_entity(Position(0.0), Velocity(2.0), Health(0))
+    world.do_systems()
+
+    stage_names = [
+        sorted(type(system).__name__ for system in stage)
+        for stage in world.scheduler.stages
+    ]
+    assert stage_names == [["Legacy"], ["Move", "Regenerate"], ["Render"]]
+    assert render.seen == [2.0]
+    assert world.edit(entity, Health).value == 1
+    assert set(world.stats.system_time) == {"Legacy", "Move", "Regenerate", "Render"}
+    world.scheduler.shutdown()
+
+
+def test_parallel_systems_spawn_unique_entities():
+    @component
+    class Marker:
+        system: int
+
+    class Spawner(System):
+        reads = ()
+        writes = ()
+
+        def __init__(self, number: int):
+            self.number = number
+
+        def do(self):
+            for _ in range(2000):
+                self.world.commands.spawn(Marker(self.number))
+            for _ in self.world.query(Marker):
+                pass
+
+    world = World()
+    world.scheduler.max_workers = 4
+    for number in range(4):
+        world.add_system(Spawner(number))
+    world.do_systems()
+    assert len(world.scheduler.stages) == 1
+    assert len(set(world.query(Marker).entities())) == 8000
+    assert world.next_entity_id == 8000
+    world.scheduler.shutdown()
+
+
+def test_create_entities_and_id_recycling():
+    @columnar_component
+    class Position:
+        x: float
+        y: float
+
+    @component
+    class Tag:
+        name: str
+
+    world = World()
+    bullets = world.create_entities(
+        100, lambda i: Position(i, -i), lambda i: Tag(f"bullet{i}")
+    )
+    assert bullets == list(range(100))
+    assert world.edit(bullets[42], Position).y == -42
+    assert world.edit(bullets[42], Tag).name == "bullet42"
+
+    world.delete_entities(bullets[:10])
+    recycled = world.create_entity(Position(0, 0))
+    assert recycled not in bullets
+    assert world.next_entity_id == 100
+    # stale handles do not reach the entity which reuses the slot
+    assert not any(world.is_exist(entity) for entity in bullets[:10])
+
+    more = world.create_entities(20, lambda i: Position(0, 0))
+    assert world.next_entity_id == 111
+    assert list(range(100, 111)) == more[9:]
+    assert len(world.query(Position)) == 111
+
+
+@columnar_component
+class SnapshotPosition:
+    xy: Vector(float, 2)
+
+
+@component
+class SnapshotName:
+    name: str
+
+
+class SnapshotMovement(System):
+    writes = (SnapshotPosition,)
+
+    def __init__(self, speed):
+        self.speed = speed
+
+    def do(self):
+        for (pos,) in self.world.query(SnapshotPosition).chunks():
+            pos.xy += self.speed
+
+
+def test_snapshot_and_restore(tmp_path):
+    world = World()
+    world.add_system(SnapshotMovement(1.0))
+    entities = world.create_entities(
+        1000, lambda i: SnapshotPosition(np.array([i, 0.0]))
+    )
+    named = world.create_entity(SnapshotPosition(np.zeros(2)), SnapshotName("boss"))
+    world.delete_entity(entities[0])
+    saved = world.snapshot()
+
+    world.do_systems()
+    world.create_entity(SnapshotName("extra"))
+    world.restore(saved)
+
+    assert len(world.query(SnapshotPosition)) == 1000
+    assert list(world.edit(entities[5], SnapshotPosition).xy) == [5.0, 0.0]
+    assert world.edit(named, SnapshotName).name == "boss"
+    assert not world.is_exist(entities[0])
+
+    save_world(world, tmp_path / "save.bin")
+    loaded = World()
+    loaded.add_system(SnapshotMovement(1.0))
+    load_world(loaded, tmp_path / "save.bin")
+    loaded.do_systems()
+    assert list(loaded.edit(entities[5], SnapshotPosition).xy) == [6.0, 1.0]
+    assert loaded.create_entity(SnapshotName("new")) not in entities
+
+
+def test_snapshot_keeps_system_instances():
+    class Render(System):
+        def __init__(self):
+            self.surface = pygame.Surface((4, 4))
+            self.callback = lambda: None
+
+        def do(self):
+            pass
+
+    class Other(System):
+        def do(self):
+            pass
+
+    world = World()
+    render, movement = Render(), SnapshotMovement(1.0)
+    world.add_system(render)
+    world.add_system(movement)
+    saved = world.snapshot()
+
+    world.remove_system(Render)
+    other = Other()
+    world.add_system(other)
+    world.add_system(render)
+    world.restore(saved)
+    assert world._systems == [render, movement, other]
@@ -0,0 +1,99 @@
+from src.auraboros.engine import FixedTimestep
+
+
+class TestFixedTimestep:
+    @staticmethod
+    def test_steps_are_independent_of_frame_rate():
+        for frame_time, frames in ((5, 600), (16, 600), (50, 600)):
+            timestep = FixedTimestep(tick_rate=100, max_steps_per_frame=10)
+            steps = sum(timestep.advance(frame_time) for _ in range(frames))
+            assert steps == frame_time * frames // 10
+            assert 0 <= timestep.alpha < 1
+
+    @staticmethod
+    def test_alpha_is_the_unsimulated_fraction():
+        timestep = FixedTimestep(tick_rate=100)
+        assert timestep.advance(25) == 2
+        assert timestep.alpha == 0.5
+
+    @staticmethod
+    def test_steps_are_capped_per_frame():
+        timestep = FixedTimestep(tick_rate=100, max_steps_per_frame=3)
+        assert timestep.advance(1005) == 3
+        assert timestep.accumulator == 5
+        assert timestep.advance(10) == 1
+
+
+class TestHeadlessRun:
+    @staticmethod
+    def test_runs_scenes_without_a_window():
+        from src.auraboros import core, engine
+        from src.auraboros.gamescene import Scene, SceneManager
+        from src.auraboros.schedule import GameClock
+
+        class CountingScene(Scene):
+            def setup(self):
+                self.dts = []
+                self.alphas = []
+
+            def update(self, dt):
+                self.dts.append(dt)
+
+            def draw_interpolated(self, screen, alpha):
+                self.alphas.append(alpha)
+
+        core.init(window_size=(64, 48), headless=True)
+        assert core.Global.is_headless
+        scene_manager = SceneManager()
+        scene = CountingScene(scene_manager)
+        scene_manager.add(scene)
+        started = GameClock.time
+        frames = engine.run(
+            scene_manager,
+            max_frames=30,
+            virtual_frame_time=25,
+            fixed_tick_rate=100,
+            quit_at_exit=False,
+        )
+        assert frames == 30
+        assert GameClock.time - started == 750
+        assert len(scene.dts) == 75 and set(scene.dts) == {10}
+        assert scene.alphas[:2] == [0.5, 0.0]
+
+        frames = engine.run(
+            scene_manager,
+            exit_condition=lambda: len(scene.dts) >= 100,
+            virtual_frame_time=10,
+            quit_at_exit=False,
+        )
+        assert frames == 25
+
+    @staticmethod
+    def test_profiler_marks_every_phase():
+        from src.auraboros import core, engine
+        from src.auraboros.gamescene import Scene, SceneManager
+        from src.auraboros.profiler import FrameProfiler
+
+        core.init(window_size=(64, 48), headless=True)
+        scene_manager = SceneManager()
+        scene_manager.add(Scene(scene_manager))
+        profiler = FrameProfiler()
+        engine.run(
+            scene_manager,
+            profiler=profiler,
+            max_frames=3,
+            virtual_frame_time=10,
+            quit_at_exit=False,
+        )
+        assert profiler.frame_count == 3
+        assert profiler.phases == [
+            "wait",
+            "timers",
+            "schedule",
+            "events",
+            "update",
+            "draw",
+            "scale",
+            "present",
+            "frame",
+        ]
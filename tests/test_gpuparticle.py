@@ -0,0 +1,124 @@
+import moderngl
+import numpy as np
+import pytest
+
+from src.auraboros.gpuparticle import GPUEmitter
+from src.auraboros.schedule import GameClock
+from src.auraboros.shader import ProgramCache
+
+from .conftest import VIEWPORT, read_pixels
+
+
+@pytest.fixture
+def clock():
+    time = GameClock.time
+    yield GameClock
+    GameClock.time = time
+
+
+def test_update_moves_particles_by_velocity(gl_ctx):
+    emitter = GPUEmitter(gl_ctx, capacity=64, seed=0)
+    emitter.x, emitter.y = 10, 20
+    emitter.set_current_program("saltire_diffusion")
+    emitter.emit(50)
+    velocities = emitter.read_particles()[:, 2:4].copy()
+    for _ in range(3):
+        emitter.update()
+    particles = emitter.read_particles()
+    assert emitter.used_slots == 50
+    assert np.allclose(particles[:, 0:2], (10, 20) + velocities * 3)
+    assert set(np.abs(velocities).sum(axis=1)) <= {1, 2}
+
+
+def test_emits_per_update_until_how_many_emit(gl_ctx):
+    emitter = GPUEmitter(gl_ctx, capacity=64, seed=0)
+    emitter.lifetime = -1
+    emitter.how_many_emit = 25
+    emitter.emit_per_update = 10
+    emitter.let_emit()
+    for _ in range(5):
+        emitter.update()
+    assert emitter.emitted_counter == 25
+    # the first particles moved on each of the five updates
+    particles = emitter.read_particles()
+    assert np.allclose(np.hypot(*particles[:10, 0:2].T), 5, atol=1e-4)
+
+
+def test_ring_buffer_replaces_oldest_particles(gl_ctx):
+    emitter = GPUEmitter(gl_ctx, capacity=8, seed=0)
+    emitter.emit(6)
+    emitter.update()
+    emitter.x = 100
+    emitter.emit(4)
+    particles = emitter.read_particles()
+    assert emitter.used_slots == 8
+    assert np.allclose(particles[[0, 1, 6, 7], 0], 100)
+    assert np.all(np.abs(particles[2:6, 0]) < 2)
+
+
+def test_particles_stop_and_die_after_lifetime(gl_ctx, clock):
+    emitter = GPUEmitter(gl_ctx, capacity=16, seed=0)
+    emitter.particle_lifetime = 100
+    emitter.emit(4)
+    assert not emitter.is_particles_lifetime_end()
+    emitter.update()
+    moved = emitter.read_particles()[:, 0:2].copy()
+    clock.time += 150
+    emitter.update()  # the particles reach their age this update
+    emitter.update()
+    particles = emitter.read_particles()
+    assert np.allclose(particles[:, 0:2], moved + particles[:, 2:4])
+    assert np.all(particles[:, 4] >= 150)
+    assert emitter.is_particles_lifetime_end()
+
+
+def test_draw_renders_only_alive_particles(gl_ctx, clock):
+    cache = ProgramCache(gl_ctx)
+    emitter = GPUEmitter(gl_ctx, capacity=16, seed=0, program_cache=cache)
+    emitter.particle_size = 1
+    emitter.particle_color = (255, 0, 0)
+    emitter.particle_lifetime = 100
+    emitter.x, emitter.y = 16, 16
+    emitter.emit(1)
+    emitter.draw(VIEWPORT)
+    pixels = read_pixels(gl_ctx)
+    assert tuple(pixels[16, 16]) == (255, 0, 0, 255)
+    assert np.count_nonzero(pixels[..., 0]) <= 9
+
+    gl_ctx.fbo.clear()
+    clock.time += 150
+    emitter.update()
+    emitter.draw(VIEWPORT)
+    assert not read_pixels(gl_ctx).any()
+
+    GPUEmitter(gl_ctx, capacity=16, program_cache=cache)
+    assert cache.hits == 2
+
+
+def test_reset_kills_every_particle(gl_ctx):
+    emitter = GPUEmitter(gl_ctx, capacity=16, seed=0)
+    emitter.particle_lifetime = -1
+    emitter.emit(10)
+    emitter.reset()
+    assert emitter.used_slots == 0
+    assert emitter.is_particles_lifetime_end()
+    emitter.emit(1)
+    emitter.update()
+    assert len(emitter.read_particles()) == 1
+
+
+@pytest.mark.parametrize("program_point_size", [False, True])
+def test_draw_leaves_the_context_state_alone(gl_ctx, program_point_size):
+    if program_point_size:
+        gl_ctx.enable(moderngl.PROGRAM_POINT_SIZE)
+    gl_ctx.point_size = 2.0
+    emitter = GPUEmitter(gl_ctx, capacity=16, seed=0)
+    emitter.particle_size = 2
+    emitter.particle_color = (255, 0, 0, 128)
+    emitter.x, emitter.y = 16, 16
+    emitter.emit(1)
+    emitter.draw(VIEWPORT)
+    pixels = read_pixels(gl_ctx)
+    assert np.count_nonzero(pixels[..., 0]) > 9  # 5 px wide either way
+    assert tuple(pixels[16, 16]) == (255, 0, 0, 128)  # blending is off
+    assert gl_ctx.point_size == 2.0
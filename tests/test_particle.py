@@ -1,6 +1,9 @@
+import numpy as np
+import pygame
 import pytest
 
-from src.auraboros.particle import Particle, Emitter
+from src.auraboros.particle import Particle, Emitter, VectorizedEmitter
+from src.auraboros.schedule import Stopwatch
 
 
 class TestParticle:
@@ -37,3 +40,89 @@ class TestEmitter:
     def test_let_freeze(self):
         self.emitter.let_freeze()
         assert not self.emitter.is_emitting
+
+    @staticmethod
+    def test_erase_finished_particles_reuses_pool():
+        emitter = Emitter(pool_capacity=4)
+        emitter.lifetime = -1
+        emitter.let_emit()
+        for _ in range(6):
+            emitter.update()
+        assert emitter.particle_count == 6
+        assert emitter._pool.capacity == 8
+        for particle in emitter.particles[::2]:
+            particle.lifetime = 0
+        emitter.erase_finished_particles()
+        assert emitter.particle_count == 3
+        assert not any(particle.is_lifetime_end() for particle in emitter.particles)
+        slots = list(emitter._pool._slots)
+        for _ in range(5):
+            emitter.update()
+        assert emitter.particle_count == 8
+        assert sorted(map(id, emitter._pool._slots)) == sorted(map(id, slots))
+
+
+class TestVectorizedEmitter:
+    @staticmethod
+    def test_emit_move_and_cull():
+        emitter = VectorizedEmitter(capacity=8, seed=0)
+        emitter.x, emitter.y = 50, 60
+        emitter.emit_per_update = 1000
+        emitter.particle_lifetime = 100
+        emitter.let_emit()
+        emitter.update()
+        assert emitter.particle_count == 1000
+        assert emitter.capacity >= 1000
+        speeds = np.hypot(*emitter.velocities.T)
+        assert np.allclose(speeds, 1.0)
+        assert np.allclose(emitter.positions, (50, 60) + emitter.velocities)
+
+        emitter.let_freeze()
+        Stopwatch.update_all_stopwatch(100)
+        emitter.update()
+        assert emitter.particle_count == 0
+        assert emitter.is_particles_lifetime_end()
+
+    @staticmethod
+    def test_how_many_emit_and_draw():
+        emitter = VectorizedEmitter(seed=0)
+        emitter.x = emitter.y = 50
+        emitter.set_current_program("saltire_diffusion")
+        emitter.emit_per_update = 300
+        emitter.how_many_emit = 500
+        emitter.let_emit()
+        emitter.update()
+        emitter.particle_color = (255, 0, 0)
+        emitter.update()
+        assert emitter.particle_count == 500
+        assert not (emitter.velocities == 0).all(axis=1).any()
+        surface = pygame.Surface((100, 100))
+        emitter.draw(surface)
+        assert surface.get_at((0, 0)) == (0, 0, 0, 255)
+        red_pos = emitter.positions[-1].astype(int).tolist()
+        assert surface.get_at(red_pos)[:3] != (0, 0, 0)
+
+    @staticmethod
+    @pytest.mark.parametrize("depth", [32, 24, 16])
+    def test_draw_matches_blitting_sprites(depth):
+        emitter = VectorizedEmitter(seed=0)
+        emitter.particle_lifetime = -1
+        emitter.emit(200)
+        emitter.particle_size = 2
+        emitter.particle_color = (0, 255, 0)
+        emitter.emit(100)
+        rng = np.random.default_rng(0)
+        emitter.positions[:] = rng.random((300, 2)) * 120 - 10  # some clipped
+        surface = pygame.Surface((100, 100), 0, depth)
+        surface.set_clip((5, 0, 90, 100))
+        expected = surface.copy()
+        emitter.draw(surface)
+
+        topleft = emitter.positions.astype(int) - emitter.sizes[:, np.newaxis]
+        for size, color in ((2, (0, 255, 0)), (3, (255, 255, 255))):
+            sprite = emitter._sprite(size, color)
+            for pos in topleft[emitter.sizes == size].tolist():
+                expected.blit(sprite, pos)
+        assert (
+            pygame.surfarray.array3d(surface) == pygame.surfarray.array3d(expected)
+        ).all()
@@ -0,0 +1,61 @@
+from pathlib import Path
+import io
+import json
+import subprocess
+import sys
+
+import pygame
+
+from src.auraboros.profiler import FrameProfiler
+
+
+def test_percentiles_of_recorded_phases():
+    profiler = FrameProfiler(capacity=100)
+    for i in range(100):
+        profiler.begin_frame()
+        profiler.record("update", (i + 1) * 1_000_000)
+        profiler.record("update", 1_000_000)  # phases accumulate in a frame
+        profiler.mark("draw")
+        profiler.end_frame()
+    stats = profiler.stats("update")
+    assert stats["max"] == 101
+    assert stats["p50"] == 51.5
+    assert 96 < stats["p95"] < 97
+    assert profiler.phases == ["update", "draw", "frame"]
+
+
+def test_ring_buffer_keeps_the_last_frames():
+    profiler = FrameProfiler(capacity=4)
+    for i in range(10):
+        profiler.begin_frame()
+        profiler.record("update", i * 1_000_000)
+        profiler.end_frame()
+    assert profiler.samples("update").tolist() == [6, 7, 8, 9]
+    assert profiler.report()["frames"] == 4
+
+
+def test_dump_and_overlay():
+    profiler = FrameProfiler()
+    profiler.begin_frame()
+    profiler.mark("update")
+    profiler.end_frame()
+    stream = io.StringIO()
+    profiler.dump(stream, include_samples=True)
+    report = json.loads(stream.getvalue())
+    assert set(report["phases"]) == {"update", "frame"}
+    assert set(report["phases"]["update"]) == {"mean", "max", "p50", "p95", "p99"}
+    assert len(report["samples"]["frame"]) == 1
+
+    pygame.font.quit()  # the overlay initialises the font module itself
+    surface = pygame.Surface((200, 100))
+    profiler.draw_overlay(surface)
+    assert surface.get_bounding_rect().width > 0
+
+
+def test_import_starts_no_pygame_subsystem():
+    code = (
+        "import pygame, src.auraboros.profiler; "
+        + "assert not pygame.font.get_init()"
+    )
+    root = Path(__file__).parents[1]
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
@@ -0,0 +1,235 @@
+import gc
+
+import pytest
+
+from src.auraboros.schedule import (
+    HeapScheduleBackend,
+    LazyStopwatch,
+    ListScheduleBackend,
+    Schedule,
+    SchedulePolicy,
+    Stopwatch,
+    TimingWheelScheduleBackend,
+)
+
+
+class TestStopwatch:
+    @staticmethod
+    def test_only_running_stopwatches_are_active():
+        running = Stopwatch()
+        idle = Stopwatch()
+        running.start()
+        assert running in Stopwatch._active
+        assert idle not in Stopwatch._active
+        Stopwatch.update_all_stopwatch(16)
+        assert running.read() == 16
+        assert idle.read() == 0
+
+        running.stop()
+        assert running not in Stopwatch._active
+        running.enable_pausing_time_count()
+        Stopwatch.update_all_stopwatch(10)
+        assert running.read_pausing() == 10
+        running.dispose()
+        assert running not in Stopwatch._active
+        assert running not in Stopwatch._instances
+
+    @staticmethod
+    def test_unreferenced_stopwatches_are_dropped():
+        count = len(Stopwatch._instances)
+        stopwatches = [Stopwatch() for _ in range(100)]
+        for stopwatch in stopwatches:
+            stopwatch.start()
+        assert len(Stopwatch._instances) == count + 100
+        del stopwatches, stopwatch
+        gc.collect()
+        assert len(Stopwatch._instances) == count
+
+
+class TestLazyStopwatch:
+    @staticmethod
+    def test_behaves_like_stopwatch():
+        eager, lazy = Stopwatch(), LazyStopwatch()
+        for stopwatch in (eager, lazy):
+            stopwatch.enable_pausing_time_count()
+            stopwatch.start()
+        Stopwatch.update_all_stopwatch(30)
+        assert eager.read() == lazy.read() == 30
+        for stopwatch in (eager, lazy):
+            stopwatch.stop()
+        Stopwatch.update_all_stopwatch(20)
+        assert eager.read() == lazy.read() == 30
+        assert eager.read_pausing() == lazy.read_pausing() == 20
+        for stopwatch in (eager, lazy):
+            stopwatch.start()
+        Stopwatch.update_all_stopwatch(5)
+        assert eager.read() == lazy.read() == 35
+        assert eager.read_pausing() == lazy.read_pausing() == 20
+        for stopwatch in (eager, lazy):
+            stopwatch.reset()
+        Stopwatch.update_all_stopwatch(7)
+        assert eager.read() == lazy.read() == 7
+        assert eager.is_playing() and lazy.is_playing()
+        eager.dispose()
+
+    @staticmethod
+    def test_is_not_registered():
+        lazy = LazyStopwatch()
+        lazy.start()
+        assert lazy not in Stopwatch._active
+
+
+@pytest.fixture(
+    params=[HeapScheduleBackend, ListScheduleBackend, TimingWheelScheduleBackend]
+)
+def schedule_backend(request):
+    default_backend = Schedule.backend
+    Schedule.backend = request.param()
+    yield Schedule.backend
+    Schedule.backend = default_backend
+
+
+class TestSchedule:
+    @staticmethod
+    def test_execute_on_interval(schedule_backend):
+        calls = []
+        job = Schedule.add(lambda: calls.append("a"), 100)
+        Schedule.add(calls.append, 0)
+        assert Schedule.is_func_scheduled(calls.append)
+        Stopwatch.update_all_stopwatch(200)
+        Schedule.execute()
+        assert calls == []  # inactive until activated
+
+        Schedule.activate_schedule(job)
+        Stopwatch.update_all_stopwatch(99)
+        Schedule.execute()
+        assert calls == []
+        Stopwatch.update_all_stopwatch(1)
+        Schedule.execute()
+        assert calls == ["a"]
+
+        Schedule.deactivate_schedule(job)
+        Stopwatch.update_all_stopwatch(1000)
+        Schedule.execute()
+        assert calls == ["a"]
+        Schedule.activate_schedule(job)
+        Schedule.change_interval(job, 50)
+        Stopwatch.update_all_stopwatch(50)
+        Schedule.execute()
+        assert calls == ["a", "a"]
+
+        Schedule.remove(job)
+        Schedule.remove(calls.append)
+        assert len(schedule_backend) == 0
+
+    @staticmethod
+    def test_zero_interval_runs_once_per_execute(schedule_backend):
+        calls = []
+
+        def tick():
+            calls.append(1)
+
+        Schedule.add(tick, 0)
+        Schedule.activate_schedule(tick)
+        Schedule.execute()
+        Schedule.execute()
+        assert len(calls) == 2
+        Schedule.remove(tick)
+
+    @staticmethod
+    def test_reset_interval_clock(schedule_backend):
+        calls = []
+        job = Schedule.add(lambda: calls.append(1), 100)
+        Schedule.activate_schedule(job)
+        Stopwatch.update_all_stopwatch(80)
+        Schedule.reset_interval_clock(job)
+        Stopwatch.update_all_stopwatch(80)
+        Schedule.execute()
+        assert calls == []
+        Stopwatch.update_all_stopwatch(20)
+        Schedule.execute()
+        assert calls == [1]
+        Schedule.remove(job)
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "policy, expected_calls",
+        [
+            (SchedulePolicy.FIRE_ONCE, [1, 1, 0, 1]),
+            (SchedulePolicy.CATCH_UP, [1, 3, 0, 1]),
+            (SchedulePolicy.PHASE_PRESERVING, [1, 1, 0, 1]),
+        ],
+    )
+    def test_policies_on_frame_spikes(schedule_backend, policy, expected_calls):
+        calls = []
+        job = Schedule.add(lambda: calls.append(1), 100, policy, max_catch_up=3)
+        Schedule.activate_schedule(job)
+        counts = []
+        for dt in (130, 400, 20, 100):
+            Stopwatch.update_all_stopwatch(dt)
+            Schedule.execute()
+            counts.append(len(calls))
+            calls.clear()
+        assert counts == expected_calls
+        Schedule.remove(job)
+
+    @staticmethod
+    def test_phase_preserving_keeps_the_rate(schedule_backend):
+        calls = []
+        policies = (SchedulePolicy.FIRE_ONCE, SchedulePolicy.PHASE_PRESERVING)
+        jobs = [Schedule.add(lambda p=p: calls.append(p), 50, p) for p in policies]
+        for job in jobs:
+            Schedule.activate_schedule(job)
+        for _ in range(100):
+            Stopwatch.update_all_stopwatch(30)
+            Schedule.execute()
+        # 3000 ms: 60 calls on the grid, while FIRE_ONCE waits 60 ms per call
+        assert calls.count(SchedulePolicy.PHASE_PRESERVING) == 60
+        assert calls.count(SchedulePolicy.FIRE_ONCE) == 50
+        for job in jobs:
+            Schedule.remove(job)
+
+    @staticmethod
+    def test_catch_up_stops_when_deactivated(schedule_backend):
+        calls = []
+
+        def tick():
+            calls.append(1)
+            if len(calls) == 2:
+                Schedule.deactivate_schedule(tick)
+
+        Schedule.add(tick, 10, SchedulePolicy.CATCH_UP)
+        Schedule.activate_schedule(tick)
+        Stopwatch.update_all_stopwatch(55)
+        Schedule.execute()
+        assert len(calls) == 2
+        Schedule.remove(tick)
+
+    @staticmethod
+    def test_backends_agree_on_long_runs():
+        import random
+
+        results = []
+        for backend in (
+            ListScheduleBackend(),
+            HeapScheduleBackend(),
+            TimingWheelScheduleBackend(slot_bits=2, levels=2),
+        ):
+            rng = random.Random(1)
+            calls, frames = [], []
+            jobs = []
+            for i in range(50):
+                job = backend.add(lambda i=i: calls.append(i), rng.randint(0, 200))
+                backend.activate(job)
+                jobs.append(job)
+            for frame in range(300):
+                Stopwatch.update_all_stopwatch(rng.choice((7, 16.5, 33)))
+                if frame % 17 == 0:
+                    backend.change_interval(rng.choice(jobs), rng.randint(1, 100))
+                if frame % 23 == 0:
+                    backend.reset(rng.choice(jobs))
+                backend.execute()
+                frames.append(sorted(calls))
+                calls.clear()
+            results.append(frames)
+        assert results[0] == results[1] == results[2]
@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import MagicMock
 import moderngl
-from src.auraboros.shader import Shader2D
+import pygame
+from src.auraboros.designpattern import Singleton
+from src.auraboros.shader import Shader2D, StreamingTexture
 
 
 @pytest.fixture
@@ -17,3 +19,199 @@ def test_shader_singleton(mock_ctx):
     assert shader1 is shader2
     shader1.test_attr = "test"
     assert shader2.test_attr is shader1.test_attr
+
+
+@pytest.fixture
+def shader2d(gl_ctx):
+    Singleton._instances.pop(Shader2D, None)
+    yield Shader2D(ctx=gl_ctx)
+    Singleton._instances.pop(Shader2D, None)
+
+
+def _texture_pixels(texture) -> bytes:
+    return texture.read(alignment=4)
+
+
+class TestStreamingTexture:
+    @staticmethod
+    @pytest.mark.parametrize("buffer_count", [None, 0, 3])
+    def test_full_and_dirty_rect_uploads(gl_ctx, buffer_count):
+        surface = pygame.Surface((32, 16), depth=32)
+        surface.fill((10, 20, 30))
+        stream = StreamingTexture(gl_ctx, surface.get_size(), buffer_count)
+        stream.write(surface)
+        assert stream.bytes_last_write == 32 * 16 * 4
+        assert _texture_pixels(stream.texture) == bytes(surface.get_view("1"))
+
+        surface.fill((200, 100, 50), (4, 2, 8, 3))
+        surface.fill((1, 2, 3), (30, 15, 5, 5))  # clipped to the surface
+        stream.write(surface, [pygame.Rect(4, 2, 8, 3), pygame.Rect(30, 15, 5, 5)])
+        assert stream.bytes_last_write == (8 * 3 + 2 * 1) * 4
+        assert _texture_pixels(stream.texture) == bytes(surface.get_view("1"))
+        assert stream.bytes_written == (32 * 16 + 8 * 3 + 2) * 4
+        stream.release()
+
+    @staticmethod
+    def test_resizes_with_the_surface(gl_ctx):
+        stream = StreamingTexture(gl_ctx, (8, 8))
+        surface = pygame.Surface((12, 4), depth=32)
+        surface.fill((5, 6, 7))
+        stream.write(surface, [pygame.Rect(0, 0, 1, 1)])  # full upload on resize
+        assert stream.size == (12, 4)
+        assert _texture_pixels(stream.texture) == bytes(surface.get_view("1"))
+        stream.release()
+
+
+def test_shader2d_counts_uploaded_bytes(shader2d):
+    surface = pygame.Surface((16, 16), depth=32)
+    shader2d.register_surface_as_texture(surface, "screen")
+    shader2d.register_surface_as_texture(
+        surface, "screen", [pygame.Rect(0, 0, 4, 4)]
+    )
+    shader2d.use_texture("screen", 0)
+    framebuffer = shader2d.ctx.simple_framebuffer((16, 16))
+    framebuffer.use()
+    shader2d.render()
+    assert shader2d.bytes_uploaded_last_frame == (16 * 16 + 4 * 4) * 4
+    shader2d.render()
+    assert shader2d.bytes_uploaded_last_frame == 0
+
+
+INVERT_FRAGMENT = """
+#version 330 core
+uniform sampler2D image;
+in vec2 uvs;
+out vec4 color;
+void main() {
+    color = vec4(1.0 - texture(image, uvs).rgb, 1.0);
+}
+"""
+
+SHIFT_FRAGMENT = """
+#version 330 core
+uniform sampler2D image;
+uniform vec2 resolution;
+in vec2 uvs;
+out vec4 color;
+void main() {
+    color = texture(image, uvs - vec2(1.0 / resolution.x, 0.0));
+}
+"""
+
+
+class TestPostProcess:
+    @staticmethod
+    def _render(shader2d) -> list[int]:
+        """Render a surface whose pixel at x=1 is white, return the red row."""
+        surface = pygame.Surface((4, 1), depth=32)
+        surface.set_at((1, 0), (255, 255, 255))
+        output = shader2d.ctx.simple_framebuffer((4, 1))
+        output.use()
+        shader2d.register_surface_as_texture(surface, "display_surface")
+        shader2d.use_texture("display_surface", 0)
+        shader2d.render()
+        return list(output.read(components=4)[::4])
+
+    def test_passes_apply_in_order(self, shader2d):
+        assert self._render(shader2d) == [0, 255, 0, 0]
+        shader2d.add_post_process(SHIFT_FRAGMENT, "shift")
+        shader2d.add_post_process(INVERT_FRAGMENT, "invert")
+        assert self._render(shader2d) == [255, 255, 0, 255]
+        shader2d.add_post_process(SHIFT_FRAGMENT, "shift_again")
+        assert self._render(shader2d) == [255, 255, 255, 0]
+        # the scene and three passes ping-pong between two targets
+        assert shader2d.render_targets.created_count == 2
+
+    def test_disabled_passes_are_skipped(self, shader2d):
+        shader2d.add_post_process(INVERT_FRAGMENT, "invert", enabled=False)
+        assert self._render(shader2d) == [0, 255, 0, 0]
+        assert shader2d.render_targets.created_count == 0
+        shader2d.set_post_process_enabled("invert", True)
+        assert self._render(shader2d) == [255, 0, 255, 255]
+        shader2d.remove_post_process("invert")
+        assert self._render(shader2d) == [0, 255, 0, 0]
+
+
+DEFINE_FRAGMENT = """#version 330 core
+uniform sampler2D image;
+in vec2 uvs;
+out vec4 color;
+void main() {
+    color = vec4(LEVEL, 0.0, 0.0, 1.0);
+}
+"""
+
+DIM_FRAGMENT = """#version 330 core
+uniform sampler2D image;
+uniform float strength;
+in vec2 uvs;
+out vec4 color;
+void main() {
+    color = vec4(texture(image, uvs).rgb * strength, 1.0);
+}
+"""
+
+
+class TestProgramCache:
+    @staticmethod
+    def test_reregistering_does_not_recompile(shader2d):
+        cache = shader2d.program_cache
+        misses = cache.misses
+        for _ in range(3):
+            shader2d.add_post_process(DEFINE_FRAGMENT, "level", defines={"LEVEL": 1.0})
+        assert cache.misses == misses + 1
+        assert cache.hits >= 2
+        shader2d.add_post_process(DEFINE_FRAGMENT, "level", defines={"LEVEL": 0.5})
+        assert cache.misses == misses + 2
+        assert len(shader2d.vaos) == 2  # display_surface and level
+
+    @staticmethod
+    def test_replaced_programs_are_released(shader2d):
+        cache = shader2d.program_cache
+        size = len(cache)
+        shader2d.add_post_process(DEFINE_FRAGMENT, "level", defines={"LEVEL": 1.0})
+        first = shader2d.programs["level"]
+        for level in (0.5, 0.25):
+            shader2d.add_post_process(
+                DEFINE_FRAGMENT, "level", defines={"LEVEL": level}
+            )
+        assert len(cache) == size + 1
+        assert isinstance(first.mglo, moderngl.mgl.InvalidObject)  # released
+        shader2d.remove_post_process("level")
+        assert len(cache) == size
+
+    @staticmethod
+    def test_names_sharing_a_source_keep_their_uniforms(shader2d):
+        shader2d.add_post_process(DIM_FRAGMENT, "dim_a")
+        shader2d.add_post_process(DIM_FRAGMENT, "dim_b")
+        shader2d.set_uniform("dim_a", "strength", 0.5)
+        shader2d.set_uniform("dim_b", "strength", 0.25)
+        assert shader2d.programs["dim_a"]["strength"].value == 0.5
+        assert shader2d.programs["dim_b"]["strength"].value == 0.25
+        surface = pygame.Surface((1, 1), depth=32)
+        surface.fill((255, 255, 255))
+        output = shader2d.ctx.simple_framebuffer((1, 1))
+        output.use()
+        shader2d.register_surface_as_texture(surface, "display_surface")
+        shader2d.use_texture("display_surface", 0)
+        shader2d.render()
+        assert 30 <= output.read(components=4)[0] <= 33  # 255 * 0.5 * 0.25
+
+    @staticmethod
+    def test_defines_are_inserted_after_version(shader2d):
+        shader2d.add_post_process(DEFINE_FRAGMENT, "level", defines={"LEVEL": 0.5})
+        output = shader2d.ctx.simple_framebuffer((1, 1))
+        output.use()
+        shader2d.register_surface_as_texture(
+            pygame.Surface((1, 1), depth=32), "display_surface"
+        )
+        shader2d.render()
+        assert 126 <= output.read(components=4)[0] <= 129
+
+    @staticmethod
+    def test_default_sources_are_loaded_lazily():
+        from src.auraboros import shader
+
+        assert "VERTEX_DEFAULT" not in vars(shader)
+        assert shader.VERTEX_DEFAULT.startswith("#version")
+        assert "sampler2D" in shader.FRAGMENT_DEFAULT
@@ -0,0 +1,104 @@
+import math
+
+import moderngl
+import numpy as np
+import pygame
+import pytest
+
+from src.auraboros.shader import ProgramCache
+from src.auraboros.spritebatch import SpriteBatch, TextureAtlas
+
+from .conftest import VIEWPORT, read_pixels
+
+
+def _solid(size, color) -> pygame.Surface:
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    surface.fill(color)
+    return surface
+
+
+class TestTextureAtlas:
+    @staticmethod
+    def test_packs_images_in_shelves(gl_ctx):
+        atlas = TextureAtlas(gl_ctx, (16, 16), padding=1)
+        a = atlas.add("a", _solid((8, 4), (255, 0, 0, 255)))
+        b = atlas.add("b", _solid((6, 6), (0, 255, 0, 255)))
+        c = atlas.add("c", _solid((8, 2), (0, 0, 255, 255)))
+        assert a.rect == (0, 0, 8, 4)
+        assert b.rect == (9, 0, 6, 6)
+        assert c.rect == (0, 7, 8, 2)
+        assert c.uv == (0, 7 / 16, 0.5, 9 / 16)
+        assert atlas.add("a", _solid((8, 4), (1, 1, 1, 255))).rect == a.rect
+        with pytest.raises(ValueError):
+            atlas.add("too large", _solid((16, 16), (0, 0, 0, 255)))
+
+
+class TestSpriteBatch:
+    @staticmethod
+    def test_draws_all_sprites_in_one_call(gl_ctx):
+        atlas = TextureAtlas(gl_ctx, (32, 32))
+        red = atlas.add("red", _solid((4, 4), (255, 0, 0, 255)))
+        green = atlas.add("green", _solid((2, 2), (0, 255, 0, 255)))
+        batch = SpriteBatch(gl_ctx, atlas, capacity=2)
+        batch.draw(red, (10, 10))
+        batch.draw(green, (30, 10), scale=4)
+        batch.draw(red, (50, 20), tint=(0.0, 0.0, 1.0, 1.0))
+        batch.draw_many(green, np.array([[5.0, 28.0], [15.0, 28.0]]))
+        assert batch.sprite_count == 5
+        batch.flush(VIEWPORT)
+        assert batch.draw_calls == 1 and batch.sprite_count == 0
+
+        pixels = read_pixels(gl_ctx)
+        assert tuple(pixels[10, 10][:3]) == (255, 0, 0)
+        assert tuple(pixels[13, 10][:3]) == (0, 0, 0)  # 4x4 centered on (10, 10)
+        assert tuple(pixels[7, 27][:3]) == (0, 255, 0)  # 8x8 after scaling
+        assert tuple(pixels[20, 50][:3]) == (0, 0, 0)  # red tinted blue
+        assert tuple(pixels[28, 15][:3]) == (0, 255, 0)
+
+    @staticmethod
+    def test_rotation_and_alpha_blending(gl_ctx):
+        atlas = TextureAtlas(gl_ctx, (32, 32))
+        bar = atlas.add("bar", _solid((16, 2), (255, 255, 255, 255)))
+        batch = SpriteBatch(gl_ctx, atlas)
+        batch.draw(bar, (16, 16), rotation=math.pi / 2)
+        batch.draw(bar, (48, 16), tint=(1.0, 1.0, 1.0, 0.5))
+        gl_ctx.enable(moderngl.BLEND)
+        gl_ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+        batch.flush(VIEWPORT)
+        pixels = read_pixels(gl_ctx)
+        assert pixels[10, 16][0] == 255  # vertical after rotation
+        assert pixels[16, 10][0] == 0
+        assert 120 <= pixels[16, 48][0] <= 135  # half transparent over black
+
+        # flush left blending on
+        batch.draw(bar, (48, 16), tint=(1.0, 1.0, 1.0, 0.5))
+        batch.flush(VIEWPORT)
+        assert 185 <= read_pixels(gl_ctx)[16, 48][0] <= 195
+
+    @staticmethod
+    def test_transparent_pixels_are_discarded_without_blending(gl_ctx):
+        atlas = TextureAtlas(gl_ctx, (32, 32))
+        half = _solid((8, 8), (0, 0, 0, 0))
+        half.fill((255, 0, 0, 255), (0, 0, 4, 8))
+        region = atlas.add("half", half)
+        batch = SpriteBatch(gl_ctx, atlas)
+        gl_ctx.fbo.clear(0.0, 1.0, 0.0, 1.0)
+        batch.draw(region, (20, 20))
+        batch.flush(VIEWPORT)
+        pixels = read_pixels(gl_ctx)
+        assert tuple(pixels[20, 17][:3]) == (255, 0, 0)
+        assert tuple(pixels[20, 22][:3]) == (0, 255, 0)
+
+    @staticmethod
+    def test_batches_share_the_program_of_a_cache(gl_ctx):
+        cache = ProgramCache(gl_ctx)
+        atlas = TextureAtlas(gl_ctx, (32, 32))
+        white = atlas.add("white", _solid((4, 4), (255, 255, 255, 255)))
+        first = SpriteBatch(gl_ctx, atlas, program_cache=cache)
+        second = SpriteBatch(gl_ctx, atlas, program_cache=cache)
+        assert first.program is second.program
+        assert (cache.misses, cache.hits) == (1, 1)
+        first.release()  # the program belongs to the cache
+        second.draw(white, (10, 10))
+        second.flush(VIEWPORT)
+        assert read_pixels(gl_ctx)[10, 10][0] == 255